@@ -1,44 +1,213 @@
+import datetime
+import functools
+import io
+import json
+import multiprocessing
 import os
+import queue
+import sqlite3
 import sys
-from flask import Flask, request, jsonify, send_from_directory
+import tempfile
+import threading
+import time
+import zipfile
+from flask import Flask, Request, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 
 # --- Add backend folder to sys.path ---
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
 # --- Import parsing engine ---
-from backend.parser_engine.base_parser import (
-    extract_text_from_pdf,
-    identify_bank,
-    find_last4,
-    find_total_balance,
-    find_payment_due_date,
-    find_billing_cycle,
-    extract_transactions_from_text,
-)
-from backend.parser_engine.hdfc_parser import parse_hdfc
-from backend.parser_engine.icici_parser import parse_icici
-from backend.parser_engine.idfc_parser import parse_idfc
-from backend.parser_engine.citi_parser import parse_citi
-from backend.parser_engine.visa_parser import parse_visa
+from backend.workers import ParseTimeout, ServerBusy, executor_from_env
+from backend.compression import compressor_from_env
+from backend.result_cache import bytes_digest, cache_from_env, stream_digest
+from backend.jobs import QueueFull, is_local_url, job_queue_from_env
+from backend.metrics import record_parse, render_gauges, render_metrics
+from backend.profiling import profiler_from_env
+from backend.history import history_from_env
+from backend.triage import TriageRejected, triage_from_env
+from backend.warmup import warm_up
+from backend.parser_engine.instrumentation import collect_stages, deadline, timed
+from backend.parser_engine.pipeline import iter_statement
+from backend.parser_engine.rules import current_rules, pinned_rules, rules_store
+from backend.parser_engine.records import TransactionColumns
+
+# --- Uploads stay in memory, spilling to disk only above UPLOAD_SPOOL_BYTES ---
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_BYTES", 8 * 1024 * 1024))
+
+
+class SpooledRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+
 
 # --- Flask setup ---
 app = Flask(__name__, static_folder="frontend", static_url_path="")
+app.request_class = SpooledRequest
 CORS(app)
 
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
-
-# --- Bank parser map ---
-PARSERS = {
-    "HDFC": parse_hdfc,
-    "ICICI": parse_icici,
-    "IDFC": parse_idfc,
-    "CITI": parse_citi,
-    "VISA": parse_visa,
-    "UNKNOWN": None,
-}
+# --- Largest request body accepted (a batch of PDFs included); bigger ones get 413 ---
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES or None
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": f"Request body is larger than {MAX_UPLOAD_BYTES} bytes"}), 413
+
+
+# --- Response compression: brotli or gzip per Accept-Encoding (see COMPRESS_*) ---
+COMPRESSOR = compressor_from_env()
+
+
+@app.after_request
+def compress_response(response):
+    return COMPRESSOR.compress(response, request.headers.get("Accept-Encoding"))
+
+
+# --- Parse result cache (content hash + parser fingerprint + rules fingerprint) ---
+RESULT_CACHE = cache_from_env()
+
+
+def cache_parse(key, rules, stats, result):
+    """
+    Cache a fresh parse under the key its request looked up, built from `rules`,
+    unless the parse ran with other rules (a pool thread or worker process
+    that had already reloaded them).
+    """
+    if stats.get("labels", {}).get("rules") == rules.fingerprint:
+        RESULT_CACHE.put(key, result)
+
+# --- Parse execution (inline or worker processes, see PARSE_MODE; slots and deadline, see PARSE_*) ---
+PARSE_EXECUTOR = executor_from_env()
+
+
+def _slot_releaser():
+    """PARSE_EXECUTOR.release_slot for a slot that may be freed from more than one place; only the first call counts."""
+    lock, released = threading.Lock(), []
+
+    def release(*_):
+        with lock:
+            if released:
+                return
+            released.append(True)
+        PARSE_EXECUTOR.release_slot()
+    return release
+
+
+def _busy(e):
+    print("🚦 Busy:", e)
+    response = jsonify({"error": str(e), "parse": PARSE_EXECUTOR.stats()})
+    response.headers["Retry-After"] = "5"
+    return response, 503
+
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", 500))
+# Total uncompressed size of the PDFs in one batch or /analytics request, ZIP members included
+BATCH_MAX_BYTES = int(os.environ.get("BATCH_MAX_BYTES", 1024 * 1024 * 1024))
+
+# --- Transaction pagination on /upload (?offset=&limit=); unset means every row ---
+UPLOAD_DEFAULT_LIMIT = int(os.environ["UPLOAD_DEFAULT_LIMIT"]) if os.environ.get("UPLOAD_DEFAULT_LIMIT") else None
+
+# --- Sampling profiler for slow uploads (PROFILE_SAMPLE_RATE > 0 enables it) ---
+PROFILER = profiler_from_env()
+
+# --- Pre-flight triage: size/page limits, PDF structure, text layer (see TRIAGE_*) ---
+TRIAGE = triage_from_env()
+
+
+def triage_upload(stream, timer=None):
+    """TRIAGE.check() on an upload before it may reach a parse worker; raises TriageRejected."""
+    with timed("triage"):
+        triage = TRIAGE.check(stream)
+    if timer is not None:
+        timer.labels["pages"] = triage["pages"]
+    print(f"🔎 Triage: {triage['pages']} pages, likely {triage['bank_hint']}")
+    return triage
+
+
+def _rejected(e):
+    print(f"🚫 Rejected ({e.reason}):", e)
+    return jsonify({"error": str(e), "reason": e.reason, "triage": e.triage}), e.status
+
+
+def _count_rejection(e):
+    record_parse({"labels": {"bank": e.triage.get("bank_hint", "unknown")}}, "rejected")
+
+
+# --- Statement history (SQLite, see HISTORY_DB; off by default) ---
+HISTORY = history_from_env()
+
+
+def store_history(digest, filename, bank, extracted_data):
+    """Record a parse in the history store; a storage failure never fails the parse."""
+    if not HISTORY.enabled:
+        return
+    try:
+        with timed("history"):
+            stored = HISTORY.ingest(digest, filename, bank, extracted_data)
+    except sqlite3.Error as e:
+        print("⚠️ History store failed:", e)
+        return
+    if stored["new"]:
+        print(f"🗄️ Stored {stored['transactions_added']} transactions ({stored['duplicates']} already known)")
+
+
+def parse_pdf_bytes(data, filename=None, bank_hint=None):
+    """Cached parse of an in-memory PDF; returns {"detected_bank", "extracted_data"}."""
+    digest = bytes_digest(data)
+    with pinned_rules() as rules:
+        key = RESULT_CACHE.key(digest, rules)
+        cached = RESULT_CACHE.get(key)
+        if cached is not None:
+            store_history(digest, filename, cached["detected_bank"], cached["extracted_data"])
+            return cached
+        try:
+            # Batches, jobs and /analytics wait their turn for a parse slot
+            bank, parsed_data, stats = PARSE_EXECUTOR.run(data, block=True, bank_hint=bank_hint)
+        except Exception:
+            record_parse({}, "error")
+            raise
+    record_parse(stats, "ok")
+    result = {"detected_bank": bank, "extracted_data": parsed_data}
+    cache_parse(key, rules, stats, result)
+    store_history(digest, filename, bank, parsed_data)
+    return result
+
+
+# --- Async job queue (POST /jobs, poll GET /jobs/<id>) ---
+JOB_QUEUE = job_queue_from_env(parse_pdf_bytes)
+
+# --- Warm-up and readiness: GET /ready answers 503 until the warm-up parse is done (WARMUP=0 skips it) ---
+READINESS = {"ready": False, "draining": False, "error": None, "warmup_ms": None, "steps": {}, "workers": 0}
+
+
+def warm_up_app():
+    """Warm this process and, in process mode, start the parse workers; then report ready."""
+    start = time.perf_counter()
+    try:
+        steps = warm_up()
+        workers = PARSE_EXECUTOR.warm()
+    except Exception as e:
+        READINESS["error"] = f"Warm-up failed: {e}"
+        print("❌ Warm-up failed:", e)
+        return
+    elapsed = round((time.perf_counter() - start) * 1000, 1)
+    READINESS.update(ready=True, warmup_ms=elapsed, steps=steps, workers=workers)
+    print(f"🔥 Warmed up in {elapsed} ms {steps}")
+
+
+if os.environ.get("WARMUP", "1").lower() in ("0", "false", "no"):
+    READINESS["ready"] = True
+elif multiprocessing.parent_process() is None:
+    # In the background, so the port is bound while we warm up. Spawned parse workers
+    # re-importing app.py as __main__ skip this: they warm up in their initializer
+    threading.Thread(target=warm_up_app, name="warm-up", daemon=True).start()
+
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    return jsonify(READINESS), 200 if READINESS["ready"] else 503
+
 
 # --- Serve frontend files ---
 @app.route("/")
@@ -49,6 +218,149 @@ def serve_index():
 def serve_static(path):
     return send_from_directory("frontend", path)
 
+# --- Per-request timing breakdown (opt in with "X-Timing: 1") ---
+def _wants_timing():
+    return request.headers.get("X-Timing", "").lower() in ("1", "true", "yes")
+
+
+def _timed_json(payload, status, timer):
+    """jsonify `payload`, timing serialization; adds the stage breakdown when the client asked for it."""
+    wants_timing = _wants_timing()
+    if wants_timing:
+        payload["timings_ms"] = {k: round(v * 1000, 3) for k, v in timer.stages.items()}
+    with timed("json_serialization"):
+        response = jsonify(payload)
+    if wants_timing:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{k};dur={v * 1000:.1f}" for k, v in timer.stages.items())
+    return response, status
+
+
+def _page_params():
+    """(offset, limit) from the query string; ValueError unless both are non-negative integers."""
+    def read(name, default):
+        raw = request.args.get(name, "")
+        if raw == "":
+            return default
+        value = int(raw)
+        if value < 0:
+            raise ValueError(name)
+        return value
+    return read("offset", 0), read("limit", UPLOAD_DEFAULT_LIMIT)
+
+
+def _paginate(extracted_data, offset, limit):
+    """A copy of extracted_data holding one page of transactions, plus its pagination block."""
+    transactions = extracted_data.get("transactions") or []
+    end = None if limit is None else offset + limit
+    page = transactions[offset:end]
+    pagination = {"offset": offset, "limit": limit, "returned": len(page), "total": len(transactions)}
+    return {**extracted_data, "transactions": page}, pagination
+
+
+# --- Response formats: row objects (default), row arrays, columnar JSON, CSV, Arrow IPC stream, Parquet ---
+UPLOAD_FORMATS = {
+    "json": None,
+    "rows": None,
+    "columnar": None,
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+# Formats that can also be streamed (?stream=)
+STREAM_FORMATS = ("json", "rows")
+
+# Order of the values in each format=rows transaction array
+ROW_FIELDS = ("date", "description", "amount", "type")
+
+
+def _row_array(row):
+    """A transaction row as a [date, description, amount, type] array (format=rows)."""
+    return [row.get(field) for field in ROW_FIELDS]
+
+
+def _top_param():
+    """Merchants listed by analytics (?top=, default 25, 0 for all); ValueError if negative."""
+    top = int(request.args.get("top") or 25)
+    if top < 0:
+        raise ValueError("top")
+    return top or None
+
+
+def _analytics_params():
+    """_top_param() for ?analytics=1, or False when analytics weren't asked for."""
+    if request.args.get("analytics", "").lower() not in ("1", "true", "yes"):
+        return False
+    return _top_param()
+
+
+def _statement_analytics(extracted_data, top):
+    from backend.analytics import analyze  # numpy loads on first use (or at warm-up)
+
+    # Over every transaction in the statement, not just the requested page
+    with timed("analytics"):
+        columns = TransactionColumns.from_rows(extracted_data.get("transactions") or [])
+        return analyze(columns, extracted_data.get("total_balance"), top)
+
+
+def _upload_response(filename, bank, extracted_data, offset, limit, fmt, cache_hit, timer, analytics=False):
+    extracted, pagination = _paginate(extracted_data, offset, limit)
+    if fmt == "json":
+        response = {
+            "filename": filename,
+            "detected_bank": bank,
+            "extracted_data": extracted,
+            "pagination": pagination,
+            "cache": {"hit": cache_hit, **RESULT_CACHE.stats()},
+        }
+        if analytics is not False:
+            response["analytics"] = _statement_analytics(extracted_data, analytics)
+        return _timed_json(response, 200, timer)
+
+    if fmt == "rows":
+        # Field names once instead of in every row: about 40% smaller than format=json before compression
+        response = {
+            "filename": filename,
+            "detected_bank": bank,
+            "transaction_fields": list(ROW_FIELDS),
+            "extracted_data": {**extracted, "transactions": [_row_array(row) for row in extracted["transactions"]]},
+            "pagination": pagination,
+            "cache": {"hit": cache_hit, **RESULT_CACHE.stats()},
+        }
+        if analytics is not False:
+            response["analytics"] = _statement_analytics(extracted_data, analytics)
+        return _timed_json(response, 200, timer)
+
+    columns = TransactionColumns.from_rows(extracted["transactions"])
+    if fmt == "columnar":
+        response = {
+            "filename": filename,
+            "detected_bank": bank,
+            "extracted_data": {**extracted, "transactions": columns.to_columnar()},
+            "pagination": pagination,
+            "cache": {"hit": cache_hit, **RESULT_CACHE.stats()},
+        }
+        if analytics is not False:
+            response["analytics"] = _statement_analytics(extracted_data, analytics)
+        return _timed_json(response, 200, timer)
+
+    # Files carry only the transactions; bank and totals go in headers
+    try:
+        with timed("export"):
+            body = {"csv": columns.to_csv, "arrow": columns.to_arrow_ipc, "parquet": columns.to_parquet}[fmt]()
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    mimetype, extension = UPLOAD_FORMATS[fmt]
+    stem = os.path.splitext(os.path.basename(filename))[0] or "statement"
+    response = Response(body, mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{stem}-transactions.{extension}"'
+    response.headers["X-Detected-Bank"] = bank
+    response.headers["X-Total-Transactions"] = str(pagination["total"])
+    return response, 200
+
+
 # --- Upload & Parse ---
 @app.route("/upload", methods=["POST"])
 def upload_pdf():
@@ -64,44 +376,642 @@ def upload_pdf():
     if not file.filename.lower().endswith(".pdf"):
         return jsonify({"error": "Invalid file type (only .pdf allowed)"}), 400
 
-    temp_path = os.path.join(app.config["UPLOAD_FOLDER"], file.filename)
-    file.save(temp_path)
-    print(f"📂 Saved file to {temp_path}")
+    try:
+        offset, limit = _page_params()
+    except ValueError:
+        return jsonify({"error": "offset and limit must be non-negative integers"}), 400
+
+    fmt = request.args.get("format", "json").lower()
+    if fmt not in UPLOAD_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(UPLOAD_FORMATS)}"}), 400
 
     try:
-        text = extract_text_from_pdf(temp_path)
-        bank = identify_bank(text)
-        print(f"🏦 Detected Bank: {bank}")
+        analytics = _analytics_params()
+    except ValueError:
+        return jsonify({"error": "top must be a non-negative integer"}), 400
 
-        parser = PARSERS.get(bank)
-        if parser:
-            parsed_data = parser(text, temp_path)
-        else:
-            parsed_data = {
-                "last_4_digits": find_last4(text),
-                "total_balance": find_total_balance(text),
-                "payment_due_date": find_payment_due_date(text),
-                "billing_cycle": find_billing_cycle(text),
-                "transactions": extract_transactions_from_text(text),
-            }
+    mode = _stream_mode()
+    if mode == "invalid":
+        return jsonify({"error": "stream must be 'ndjson' or 'json'"}), 400
+    if mode and fmt not in STREAM_FORMATS:
+        return jsonify({"error": f"only format={' or format='.join(STREAM_FORMATS)} can be streamed"}), 400
+    if analytics is not False and (mode or UPLOAD_FORMATS[fmt]):
+        return jsonify({"error": "analytics are only added to JSON responses; use POST /analytics"}), 400
+    if mode:
+        # Triaged up front: once the stream starts, the status line can't change
+        try:
+            triage = triage_upload(file.stream)
+            PARSE_EXECUTOR.acquire_slot()
+        except TriageRejected as e:
+            _count_rejection(e)
+            return _rejected(e)
+        except ServerBusy as e:
+            return _busy(e)
+        release = _slot_releaser()
+        response = _stream_upload(file, mode, offset, limit, on_done=release, rows=fmt == "rows",
+                                  bank_hint=triage["bank_hint"])
+        # Also on close(), which covers a client that goes away before the body starts
+        response.call_on_close(release)
+        return response
+
+    started = time.perf_counter()
+    outcome = "error"
+    # One RuleSet for the cache lookup, an inline parse and the cache store
+    with collect_stages() as timer, pinned_rules() as rules:
+        try:
+            # Parse straight from the request buffer; nothing is written under a shared filename
+            with timed("hash"):
+                digest = stream_digest(file.stream)
+            key = RESULT_CACHE.key(digest, rules)
+            cached = RESULT_CACHE.get(key)
+            if cached is not None:
+                print("⚡ Cache hit")
+                outcome = "cache_hit"
+                timer.labels["bank"] = cached["detected_bank"]
+                store_history(digest, file.filename, cached["detected_bank"], cached["extracted_data"])
+                return _upload_response(file.filename, cached["detected_bank"], cached["extracted_data"],
+                                        offset, limit, fmt, True, timer, analytics)
+
+            triage = triage_upload(file.stream, timer)
+            if PROFILER.should_sample():
+                # Parse in this process so cProfile/tracemalloc see the pdfplumber work
+                with PROFILER.capture() as capture:
+                    capture.describe(filename=file.filename)
+                    bank, parsed_data, stats = PARSE_EXECUTOR.run(file.stream, local=True,
+                                                                         bank_hint=triage["bank_hint"])
+                    capture.describe(bank=bank, pages=stats["labels"].get("pages"),
+                                     stages_ms={k: round(v * 1000, 1) for k, v in stats["stages"].items()})
+            else:
+                bank, parsed_data, stats = PARSE_EXECUTOR.run(file.stream, bank_hint=triage["bank_hint"])
+            timer.merge(stats)
+            print(f"🏦 Detected Bank: {bank}")
+
+            cache_parse(key, rules, stats, {"detected_bank": bank, "extracted_data": parsed_data})
+            store_history(digest, file.filename, bank, parsed_data)
+
+            print("✅ Successfully parsed PDF")
+            outcome = "ok"
+            return _upload_response(file.filename, bank, parsed_data, offset, limit, fmt, False, timer, analytics)
+
+        except TriageRejected as e:
+            outcome = "rejected"
+            timer.labels["bank"] = e.triage.get("bank_hint", "unknown")
+            return _rejected(e)
+
+        except ParseTimeout as e:
+            print("⏱️ Timeout:", e)
+            outcome = "timeout"
+            return jsonify({"error": str(e)}), 504
+
+        except ServerBusy as e:
+            outcome = "busy"
+            return _busy(e)
+
+        except Exception as e:
+            print("❌ Error:", e)
+            return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+        finally:
+            file.close()
+            record_parse(timer.as_dict(), outcome, time.perf_counter() - started)
+
+
+# --- Streaming Upload (?stream=ndjson|json, optionally with format=rows) ---
+def _stream_mode():
+    mode = request.args.get("stream", "").lower()
+    if not mode and "application/x-ndjson" in request.headers.get("Accept", ""):
+        mode = "ndjson"
+    if mode in ("", "0", "false"):
+        return None
+    return mode if mode in ("ndjson", "json") else "invalid"
 
-        response = {
-            "filename": file.filename,
-            "detected_bank": bank,
-            "extracted_data": parsed_data,
-        }
 
-        print("✅ Successfully parsed PDF")
-        return jsonify(response), 200
+def _cached_events(cached):
+    """The iter_statement() events for a cached result."""
+    data = dict(cached["extracted_data"])
+    transactions = data.pop("transactions", [])
+    yield "statement", {"bank": cached["detected_bank"], "pages": None}
+    for row in transactions:
+        yield "transaction", row
+    yield "fields", data
 
+
+def _paginated_events(events, offset, limit):
+    """Only pass on transactions offset..offset+limit; a pagination event precedes the fields."""
+    seen = returned = 0
+    for kind, value in events:
+        if kind == "transaction":
+            seen += 1
+            if seen <= offset or (limit is not None and returned >= limit):
+                continue
+            returned += 1
+        elif kind == "fields":
+            yield "pagination", {"offset": offset, "limit": limit, "returned": returned, "total": seen}
+        yield kind, value
+
+
+def _ndjson_chunks(filename, events, rows=False):
+    """
+    A header line, one line per transaction, then the header fields with the
+    pagination block. With rows=True each transaction line is a bare
+    [date, description, amount, type] array, named by the header's transaction_fields.
+    """
+    pagination = None
+    try:
+        for kind, value in events:
+            if kind == "statement":
+                header = {"filename": filename, "detected_bank": value["bank"],
+                          "pages": value["pages"], "cache": {"hit": value.get("cache_hit", False)}}
+                if rows:
+                    header["transaction_fields"] = list(ROW_FIELDS)
+                yield json.dumps(header) + "\n"
+            elif kind == "transaction":
+                if rows:
+                    yield json.dumps(_row_array(value), separators=(",", ":")) + "\n"
+                else:
+                    yield json.dumps({"transaction": value}) + "\n"
+            elif kind == "pagination":
+                pagination = value
+            else:
+                yield json.dumps({"extracted_data": value, "pagination": pagination}) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": f"Server error: {str(e)}"}) + "\n"
+        raise
+
+
+def _json_chunks(filename, events, rows=False):
+    """One JSON document shaped like the regular /upload response (or its format=rows variant), written as rows arrive."""
+    state = "start"
+    pagination = None
+    try:
+        for kind, value in events:
+            if kind == "statement":
+                fields = f'"transaction_fields": {json.dumps(list(ROW_FIELDS))}, ' if rows else ""
+                yield (f'{{"filename": {json.dumps(filename)}, "detected_bank": {json.dumps(value["bank"])}, '
+                       f'"cache": {{"hit": {json.dumps(value.get("cache_hit", False))}}}, {fields}'
+                       f'"extracted_data": {{"transactions": [')
+                state = "first_row"
+            elif kind == "transaction":
+                yield ("" if state == "first_row" else ", ") + json.dumps(_row_array(value) if rows else value)
+                state = "rows"
+            elif kind == "pagination":
+                pagination = value
+            else:
+                yield ("]" + "".join(f", {json.dumps(k)}: {json.dumps(v)}" for k, v in value.items())
+                       + f'}}, "pagination": {json.dumps(pagination)}}}')
+                state = "done"
     except Exception as e:
-        print("❌ Error:", e)
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
+        # The status line is long gone, so the error goes into the document itself
+        error = json.dumps(f"Server error: {str(e)}")
+        if state == "start":
+            yield f'{{"filename": {json.dumps(filename)}, "error": {error}}}'
+        elif state != "done":
+            yield f'], "error": {error}}}}}'
+        raise
+
+
+def _stream_upload(file, mode, offset=0, limit=None, on_done=None, rows=False, bank_hint=None):
+    """
+    Parse in the request thread and send each transaction as soon as its page
+    is done, so neither side holds the whole statement. Streamed results aren't
+    cached (that would mean keeping every row), but a cached result is replayed.
+    rows=True sends transactions as arrays (format=rows).
+    `on_done()` is called once the body has been written; `bank_hint` is the triage's guess.
+    """
+    filename = file.filename
+    writer = _ndjson_chunks if mode == "ndjson" else _json_chunks
+    # Flask closes request files once the view returns; the response body outlives it
+    stream, file.stream = file.stream, io.BytesIO()
+    outcome = {"value": "error"}
+
+    def events(timer):
+        with timed("hash"):
+            digest = stream_digest(stream)
+        cached = RESULT_CACHE.get(RESULT_CACHE.key(digest))
+        if cached is not None:
+            print("⚡ Cache hit")
+            timer.labels["bank"] = cached["detected_bank"]
+            for kind, value in _cached_events(cached):
+                yield kind, ({**value, "cache_hit": True} if kind == "statement" else value)
+            outcome["value"] = "cache_hit"
+            store_history(digest, filename, cached["detected_bank"], cached["extracted_data"])
+            return
+        if not HISTORY.enabled:
+            yield from iter_statement(stream, bank_hint)
+        else:
+            # The store needs the whole statement, so rows are kept until the fields arrive
+            bank, rows = None, []
+            for kind, value in iter_statement(stream, bank_hint):
+                if kind == "statement":
+                    bank = value["bank"]
+                elif kind == "transaction":
+                    rows.append(value)
+                else:
+                    store_history(digest, filename, bank, {**value, "transactions": rows})
+                yield kind, value
+        print(f"🏦 Streamed {timer.labels.get('bank')} statement")
+        outcome["value"] = "ok"
+
+    def generate():
+        started = time.perf_counter()
+        with collect_stages() as timer, deadline(PARSE_EXECUTOR.timeout):
+            try:
+                yield from writer(filename, _paginated_events(events(timer), offset, limit), rows)
+            except Exception as e:
+                print("❌ Error:", e)
+                if isinstance(e, ParseTimeout):
+                    outcome["value"] = "timeout"
+            finally:
+                stream.close()
+                record_parse(timer.as_dict(), outcome["value"], time.perf_counter() - started)
+                if on_done:
+                    on_done()
+
+    mimetype = "application/x-ndjson" if mode == "ndjson" else "application/json"
+    return Response(generate(), mimetype=mimetype)
+
+
+# --- Batch Upload (NDJSON stream) ---
+class BatchTooLarge(Exception):
+    """The PDFs in a batch add up to more than BATCH_MAX_BYTES once unpacked."""
+
+
+@app.errorhandler(BatchTooLarge)
+def batch_too_large(e):
+    return jsonify({"error": str(e)}), 413
+
+
+def _stream_size(stream):
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+
+def _collect_batch_files():
+    """
+    (filename, load, error) for every PDF in the request, unpacking ZIP archives;
+    load() reads the file, so only one is in memory at a time. ZIP members are
+    sized from their headers (which bound what zipfile will inflate): one over
+    the triage byte limit is rejected, and a batch adding up to more than
+    BATCH_MAX_BYTES raises BatchTooLarge before anything is read.
+    """
+    items = []
+    total = 0
+
+    def add(name, size, load):
+        nonlocal total
+        if TRIAGE.max_bytes and size > TRIAGE.max_bytes:
+            items.append((name, None, f"File is larger than {TRIAGE.max_bytes} bytes"))
+            return
+        total += size
+        if BATCH_MAX_BYTES and total > BATCH_MAX_BYTES:
+            raise BatchTooLarge(f"Files add up to more than {BATCH_MAX_BYTES} bytes uncompressed")
+        items.append((name, load, None))
+
+    for file in request.files.getlist("pdfs") + request.files.getlist("pdf"):
+        name = file.filename or ""
+        if name.lower().endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(file.stream)
+            except zipfile.BadZipFile:
+                items.append((name, None, "Invalid ZIP archive"))
+                continue
+            for member in archive.infolist():
+                if member.is_dir() or member.filename.startswith("__MACOSX/"):
+                    continue
+                if not member.filename.lower().endswith(".pdf"):
+                    items.append((member.filename, None, "Invalid file type (only .pdf allowed)"))
+                    continue
+                add(member.filename, member.file_size, functools.partial(archive.read, member))
+        elif name.lower().endswith(".pdf"):
+            add(name, _stream_size(file.stream), file.stream.read)
+        else:
+            items.append((name, None, "Invalid file type (only .pdf allowed)"))
+    return items
+
+
+def _detach_uploads():
+    """
+    The uploaded files' streams, taken off the request (Flask closes its files
+    once the view returns) for a response body that reads them later; the
+    caller closes them.
+    """
+    streams = []
+    for file in request.files.getlist("pdfs") + request.files.getlist("pdf"):
+        streams.append(file.stream)
+        file.stream = io.BytesIO()
+    return streams
+
+
+def _load_batch_file(load):
+    """(bytes, None) from a _collect_batch_files() loader, or (None, error) for a damaged ZIP member."""
+    try:
+        return load(), None
+    except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+        # Bad CRC, encrypted or an unsupported compression method
+        return None, f"Can't read from the ZIP archive: {e}"
+
+
+@app.route("/upload/batch", methods=["POST"])
+def upload_batch():
+    """
+    Parse many PDFs (fields 'pdfs'/'pdf', PDFs or ZIP archives) concurrently and
+    stream one JSON line per file as soon as it finishes, then a summary line.
+    """
+    print("📦 Received batch upload request")
+    items = _collect_batch_files()
+    if not items:
+        return jsonify({"error": "No files in fields 'pdfs' or 'pdf'"}), 400
+    if len(items) > BATCH_MAX_FILES:
+        return jsonify({"error": f"Too many files (max {BATCH_MAX_FILES})"}), 413
+    # Files are read one at a time as the body is sent, so they must outlive the view
+    streams = _detach_uploads()
+    # Every file's cache key comes from the rules in use when the batch arrived
+    rules = current_rules()
+
+    def feed(out, stop):
+        """
+        Put each file's outcome on `out` in order: a finished line for errors and
+        cache hits, a future for parses (submit waits for a parse slot), then the
+        number of futures. In its own thread, so results stream while files wait.
+        """
+        submitted = 0
+        try:
+            for filename, load, error in items:
+                if stop.is_set():
+                    break
+                if not error:
+                    data, error = _load_batch_file(load)
+                if error:
+                    out.put((filename, None, None, {"filename": filename, "error": error}))
+                    continue
+                digest = bytes_digest(data)
+                key = RESULT_CACHE.key(digest, rules)
+                cached = RESULT_CACHE.get(key)
+                if cached is not None:
+                    store_history(digest, filename, cached["detected_bank"], cached["extracted_data"])
+                    out.put((filename, None, None, {"filename": filename, **cached, "cache": {"hit": True}}))
+                    continue
+                try:
+                    triage = triage_upload(io.BytesIO(data))
+                except TriageRejected as e:
+                    _count_rejection(e)
+                    out.put((filename, None, None, {"filename": filename, "error": str(e), "reason": e.reason}))
+                    continue
+                future = PARSE_EXECUTOR.submit(data, triage["bank_hint"])
+                submitted += 1
+                future.add_done_callback(
+                    lambda f, filename=filename, digest=digest, key=key: out.put((filename, digest, key, f)))
+        except Exception as e:
+            if not stop.is_set():  # after a disconnect the request's files are already closed
+                print("❌ Batch submission failed:", e)
+                out.put((None, None, None, {"error": f"Server error: {str(e)}"}))
+        finally:
+            out.put(submitted)
+
+    def generate():
+        ok = failed = 0
+        out, stop = queue.Queue(), threading.Event()
+        threading.Thread(target=feed, args=(out, stop), name="batch-feed", daemon=True).start()
+        try:
+            submitted, received = None, 0
+            while submitted is None or received < submitted:
+                entry = out.get()
+                if isinstance(entry, int):
+                    submitted = entry
+                    continue
+                filename, digest, key, outcome = entry
+                if isinstance(outcome, dict):
+                    if "error" in outcome:
+                        failed += 1
+                    else:
+                        ok += 1
+                    yield json.dumps(outcome) + "\n"
+                    continue
+                received += 1
+                try:
+                    bank, parsed_data, stats = outcome.result()
+                except Exception as e:
+                    record_parse({}, "error")
+                    failed += 1
+                    print(f"❌ Error in {filename}:", e)
+                    yield json.dumps({"filename": filename, "error": f"Server error: {str(e)}"}) + "\n"
+                    continue
+                record_parse(stats, "ok")
+                result = {"detected_bank": bank, "extracted_data": parsed_data}
+                cache_parse(key, rules, stats, result)
+                store_history(digest, filename, bank, parsed_data)
+                ok += 1
+                yield json.dumps({"filename": filename, **result, "cache": {"hit": False}}) + "\n"
+        finally:
+            # A client that goes away stops the rest of the batch from being submitted
+            stop.set()
+            for stream in streams:
+                stream.close()
+
+        print(f"✅ Batch done: {ok} parsed, {failed} failed")
+        yield json.dumps({"summary": {"files": len(items), "parsed": ok, "failed": failed}}) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+# --- Analytics over one or many statements ---
+@app.route("/analytics", methods=["POST"])
+def statement_analytics():
+    """
+    Spend by merchant/category/day, recurring charges and reconciliation for
+    a history: PDFs/ZIPs in 'pdfs'/'pdf' (each reconciled against its own
+    total), or a JSON body {"transactions": rows or columnar, "total_balance"}.
+    """
+    from backend.analytics import StatementFrame, analyze, reconcile
+
+    print("📊 Received analytics request")
+    try:
+        top = _top_param()
+    except ValueError:
+        return jsonify({"error": "top must be a non-negative integer"}), 400
+
+    if request.is_json:
+        body = request.get_json(silent=True)
+        transactions = body.get("transactions") if isinstance(body, dict) else None
+        if not isinstance(transactions, (list, dict)):
+            return jsonify({"error": "JSON body needs 'transactions' (rows or columnar)"}), 400
+        try:
+            if isinstance(transactions, dict):
+                columns = TransactionColumns.from_columnar(transactions)
+            else:
+                columns = TransactionColumns.from_rows(transactions)
+        except (AttributeError, TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid transactions: {e}"}), 400
+        total_balance = body.get("total_balance")
+        if isinstance(total_balance, bool) or not isinstance(total_balance, (str, int, float, type(None))):
+            return jsonify({"error": "total_balance must be rupees, as a string ('1,234.50') or a number"}), 400
+        return jsonify({"analytics": analyze(columns, total_balance, top)}), 200
+
+    items = _collect_batch_files()
+    if not items:
+        return jsonify({"error": "Send PDFs in 'pdfs'/'pdf' or a JSON body with 'transactions'"}), 400
+    if len(items) > BATCH_MAX_FILES:
+        return jsonify({"error": f"Too many files (max {BATCH_MAX_FILES})"}), 413
+
+    history = TransactionColumns()
+    statements = []
+    for filename, load, error in items:
+        if not error:
+            data, error = _load_batch_file(load)
+        if error:
+            statements.append({"filename": filename, "error": error})
+            continue
+        try:
+            triage = triage_upload(io.BytesIO(data))
+            result = parse_pdf_bytes(data, filename, triage["bank_hint"])
+        except TriageRejected as e:
+            _count_rejection(e)
+            statements.append({"filename": filename, "error": str(e), "reason": e.reason})
+            continue
+        except Exception as e:
+            print(f"❌ Error in {filename}:", e)
+            statements.append({"filename": filename, "error": f"Server error: {str(e)}"})
+            continue
+        extracted = result["extracted_data"]
+        columns = TransactionColumns.from_rows(extracted.get("transactions") or [])
+        for tx in columns:
+            history.append(tx)
+        statements.append({
+            "filename": filename,
+            "detected_bank": result["detected_bank"],
+            "transactions": len(columns),
+            "reconciliation": reconcile(StatementFrame(columns), extracted.get("total_balance")),
+        })
+
+    print(f"✅ Analytics over {len(history)} transactions from {len(items)} file(s)")
+    return jsonify({"statements": statements, "analytics": analyze(history, None, top)}), 200
+
+
+# --- Async Jobs ---
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    """Queue a parse and return immediately; poll /jobs/<id> or pass a local 'webhook' URL."""
+    if "pdf" not in request.files:
+        return jsonify({"error": "Missing file field 'pdf'"}), 400
+
+    file = request.files["pdf"]
+    if file.filename == "":
+        return jsonify({"error": "No file selected"}), 400
+
+    if not file.filename.lower().endswith(".pdf"):
+        return jsonify({"error": "Invalid file type (only .pdf allowed)"}), 400
+
+    webhook = request.form.get("webhook") or None
+    if webhook and not is_local_url(webhook):
+        return jsonify({"error": "Webhook must be a local http(s) URL"}), 400
+
+    try:
+        triage = triage_upload(file.stream)
+    except TriageRejected as e:
+        _count_rejection(e)
+        return _rejected(e)
+
+    try:
+        job_id = JOB_QUEUE.submit(file.read(), file.filename, webhook=webhook, bank_hint=triage["bank_hint"])
+    except QueueFull as e:
+        print("🚦 Job rejected:", e)
+        response = jsonify({"error": str(e), "queue": JOB_QUEUE.stats()})
+        response.headers["Retry-After"] = "5"
+        return response, 429
+
+    print(f"🗂️ Queued job {job_id}")
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+
+
+@app.route("/jobs/stats", methods=["GET"])
+def job_stats():
+    return jsonify(JOB_QUEUE.stats()), 200
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(job), 200
+
+
+# --- Stored statement history (HISTORY_DB) ---
+def _iso_param(name):
+    raw = request.args.get(name) or None
+    if raw:
+        datetime.date.fromisoformat(raw)  # ValueError for anything but YYYY-MM-DD
+    return raw
+
+
+@app.route("/history/transactions", methods=["GET"])
+def history_transactions():
+    """
+    Search stored transactions: ?card= (last 4), ?from=&to= (ISO dates,
+    inclusive), ?merchant= (merchant name prefix), ?q= (description text),
+    paged with ?offset=&limit= (newest first).
+    """
+    if not HISTORY.enabled:
+        return jsonify({"error": "History store is disabled (set HISTORY_DB)"}), 404
+    try:
+        start, end = _iso_param("from"), _iso_param("to")
+    except ValueError:
+        return jsonify({"error": "from and to must be YYYY-MM-DD dates"}), 400
+    try:
+        offset, limit = _page_params()
+    except ValueError:
+        return jsonify({"error": "offset and limit must be non-negative integers"}), 400
+    limit = 100 if limit is None else limit
+
+    rows, total, paise = HISTORY.transactions(
+        card=request.args.get("card") or None, start=start, end=end,
+        merchant=request.args.get("merchant") or None, text=request.args.get("q") or None,
+        limit=limit, offset=offset)
+    pagination = {"offset": offset, "limit": limit, "returned": len(rows), "total": total}
+    return jsonify({"transactions": rows, "total_paise": paise, "pagination": pagination}), 200
+
+
+@app.route("/history/statements", methods=["GET"])
+def history_statements():
+    if not HISTORY.enabled:
+        return jsonify({"error": "History store is disabled (set HISTORY_DB)"}), 404
+    return jsonify({"statements": HISTORY.statements(request.args.get("card") or None),
+                    "stats": HISTORY.stats()}), 200
+
+
+# --- Parser rules (rules.json or PARSER_RULES, reloaded when the file changes) ---
+@app.route("/rules", methods=["GET"])
+def parser_rules():
+    store = rules_store()
+    return jsonify({**store.stats(), "path": str(store.path), "banks": list(store.get().profiles)}), 200
+
+
+# --- Metrics (Prometheus text format) ---
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    body = render_metrics(
+        render_gauges("result_cache", RESULT_CACHE.stats(), "Parse result cache"),
+        render_gauges("job_queue", JOB_QUEUE.stats(), "Async job queue"),
+        render_gauges("history", HISTORY.stats(), "Statement history store"),
+        render_gauges("parse", PARSE_EXECUTOR.stats(), "Parse concurrency slots"),
+        render_gauges("parser_rules", rules_store().stats(), "Parser rules file"),
+    )
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+# --- Captured profiles of slow uploads ---
+@app.route("/profiles", methods=["GET"])
+def list_profiles():
+    return jsonify({"enabled": PROFILER.enabled, "profiles": PROFILER.list()}), 200
+
 
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-            print("🧹 Cleaned up uploaded file")
+@app.route("/profiles/<path:name>", methods=["GET"])
+def download_profile(name):
+    if not name.endswith((".json", ".prof")):
+        return jsonify({"error": "Unknown profile file"}), 404
+    return send_from_directory(os.path.abspath(PROFILER.directory), name, as_attachment=True)
 
 
 # --- Railway Deployment Entry Point ---
@@ -0,0 +1,241 @@
+# backend/analytics.py
+import datetime
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from backend.parser_engine.records import NULL_PAISE, TYPE_CODES, TransactionType, parse_amount
+
+# First match wins; checked against the normalized merchant name
+CATEGORY_KEYWORDS = (
+    ("Dining", ("swiggy", "zomato", "starbucks", "restaurant", "cafe", "coffee", "dominos", "mcdonald", "kfc", "pizza")),
+    ("Groceries", ("grocer", "bigbasket", "blinkit", "zepto", "dmart", "big bazaar", "supermarket", "reliance smart")),
+    ("Fuel", ("petrol", "fuel", "shell", "hpcl", "bpcl", "indian oil")),
+    ("Travel", ("uber", "ola cabs", "irctc", "indigo", "airline", "air india", "vistara", "makemytrip", "hotel", "rail")),
+    ("Entertainment", ("netflix", "spotify", "prime video", "hotstar", "bookmyshow", "pvr", "inox")),
+    ("Utilities", ("electricity", "airtel", "jio", "vodafone", "broadband", "recharge", "bill pay")),
+    ("Health", ("pharmacy", "apollo", "hospital", "clinic", "medplus", "1mg")),
+    ("Fees & Interest", ("finance charge", "interest", "late fee", "annual fee", "surcharge")),
+    ("Shopping", ("amazon", "flipkart", "myntra", "ajio", "croma", "nykaa", "electronics", "mall", "store")),
+)
+OTHER_CATEGORY = "Other"
+
+# Categories forced by the transaction type, whatever the merchant
+TYPE_CATEGORIES = {
+    TransactionType.CASH_ADVANCE: "Cash Advance",
+    TransactionType.FINANCE_CHARGE: "Fees & Interest",
+}
+
+# name: (min, max) mean days between charges
+CADENCES = (("weekly", 6, 8), ("monthly", 26, 35), ("quarterly", 85, 96), ("yearly", 350, 380))
+RECURRING_MIN_CHARGES = 3
+RECURRING_MAX_AMOUNT_CV = 0.1      # std / mean of the charged amounts
+RECURRING_MAX_GAP_STD = 4          # days
+
+# Totals within a rupee reconcile
+RECONCILE_TOLERANCE_PAISE = 100
+
+_MERCHANT_DOMAIN_RE = re.compile(r"\.(?:com|co|in|net)\b")
+_MERCHANT_NOISE_RE = re.compile(r"[^a-z& ]+")
+_MERCHANT_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def merchant_key(description):
+    """'Reliance Smart, Andheri' / 'NETFLIX.COM 8812' -> 'reliance smart' / 'netflix'."""
+    name = re.split(r",| - ", description.lower(), maxsplit=1)[0]
+    name = _MERCHANT_NOISE_RE.sub(" ", _MERCHANT_DOMAIN_RE.sub("", name))
+    name = _MERCHANT_SPACE_RE.sub(" ", name).strip()
+    return name or description.strip().lower()
+
+
+def categorize(merchant):
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(k in merchant for k in keywords):
+            return category
+    return OTHER_CATEGORY
+
+
+def _date(ordinal):
+    return datetime.date.fromordinal(int(ordinal)).isoformat() if ordinal else None
+
+
+def _sums(codes, weights, size):
+    # bincount adds in float64, exact for any realistic paise total (< 2**53)
+    return np.rint(np.bincount(codes, weights=weights, minlength=size)).astype(np.int64)
+
+
+class StatementFrame:
+    """
+    NumPy view of a TransactionColumns: amounts and dates share the typed
+    arrays' buffers, and descriptions are factorized to merchant codes once,
+    so every aggregate below is a bincount or a sort rather than a row loop.
+    """
+
+    def __init__(self, columns):
+        self.dates = np.frombuffer(columns.dates, dtype=np.int64)
+        self.amounts = np.frombuffer(columns.amounts, dtype=np.int64)
+        self.types = np.frombuffer(bytes(columns.types), dtype=np.uint8)
+        self.known = self.amounts != NULL_PAISE
+        self.spend = np.where(self.known & (self.amounts > 0), self.amounts, 0)
+        self.credits = np.where(self.known & (self.amounts < 0), -self.amounts, 0)
+
+        # description -> merchant -> category, each computed once per distinct value
+        by_description = {}
+        codes = np.fromiter((by_description.setdefault(d, len(by_description)) for d in columns.descriptions),
+                            dtype=np.int64, count=len(columns))
+        merchant_index = {}
+        self.merchants = []
+        description_merchant = np.empty(len(by_description), dtype=np.int64)
+        for description, i in by_description.items():
+            key = merchant_key(description)
+            if key not in merchant_index:
+                merchant_index[key] = len(self.merchants)
+                self.merchants.append(key)
+            description_merchant[i] = merchant_index[key]
+        self.merchant_codes = description_merchant[codes]
+
+        self.categories = list(dict.fromkeys(
+            [OTHER_CATEGORY] + [c for c, _ in CATEGORY_KEYWORDS] + list(TYPE_CATEGORIES.values())))
+        category_index = {c: i for i, c in enumerate(self.categories)}
+        self.merchant_categories = [categorize(m) for m in self.merchants]
+        merchant_category = np.array([category_index[c] for c in self.merchant_categories], dtype=np.int64)
+        self.category_codes = merchant_category[self.merchant_codes]
+        for tx_type, category in TYPE_CATEGORIES.items():
+            forced = self.types == TYPE_CODES.index(tx_type)
+            self.category_codes = np.where(forced, category_index[category], self.category_codes)
+
+    def __len__(self):
+        return len(self.amounts)
+
+
+# --- Aggregates ---
+def summary(frame):
+    dated = frame.dates[frame.dates > 0]
+    spend, credits = int(frame.spend.sum()), int(frame.credits.sum())
+    return {
+        "transactions": len(frame),
+        "spend_paise": spend,
+        "credits_paise": credits,
+        "net_paise": spend - credits,
+        "unparsed_amounts": int((~frame.known).sum()),
+        "first_date": _date(dated.min()) if dated.size else None,
+        "last_date": _date(dated.max()) if dated.size else None,
+    }
+
+
+def spend_by_merchant(frame, top=None):
+    """Merchants by total spend, largest first; top=None keeps all of them."""
+    size = len(frame.merchants)
+    totals = _sums(frame.merchant_codes, frame.spend, size)
+    counts = np.bincount(frame.merchant_codes, weights=frame.spend > 0, minlength=size).astype(np.int64)
+    order = np.argsort(-totals, kind="stable")
+    order = order[totals[order] > 0][:top]
+    return [{"merchant": frame.merchants[i], "category": frame.merchant_categories[i],
+             "spend_paise": int(totals[i]), "count": int(counts[i])} for i in order]
+
+
+def spend_by_category(frame):
+    size = len(frame.categories)
+    totals = _sums(frame.category_codes, frame.spend, size)
+    counts = np.bincount(frame.category_codes, weights=frame.spend > 0, minlength=size).astype(np.int64)
+    order = np.argsort(-totals, kind="stable")
+    return [{"category": frame.categories[i], "spend_paise": int(totals[i]), "count": int(counts[i])}
+            for i in order if totals[i] > 0]
+
+
+def spend_by_day(frame):
+    """Daily spend in date order (days without charges are left out)."""
+    dated = frame.dates > 0
+    days, inverse = np.unique(frame.dates[dated], return_inverse=True)
+    totals = _sums(inverse, frame.spend[dated], len(days))
+    counts = np.bincount(inverse, weights=frame.spend[dated] > 0, minlength=len(days)).astype(np.int64)
+    return [{"date": _date(d), "spend_paise": int(t), "count": int(c)}
+            for d, t, c in zip(days, totals, counts) if t > 0]
+
+
+def recurring_charges(frame):
+    """
+    Merchants charged at least RECURRING_MIN_CHARGES times at a steady
+    cadence (weekly, monthly, quarterly, yearly) for a near-constant amount.
+    Charges are sorted by (merchant, date) once; per-merchant gap and amount
+    statistics then come from reduceat over the sorted arrays.
+    """
+    rows = np.flatnonzero((frame.spend > 0) & (frame.dates > 0))
+    if rows.size < RECURRING_MIN_CHARGES:
+        return []
+    rows = rows[np.lexsort((frame.dates[rows], frame.merchant_codes[rows]))]
+    merchants, dates = frame.merchant_codes[rows], frame.dates[rows]
+    amounts = frame.spend[rows].astype(np.float64)
+
+    starts = np.flatnonzero(np.r_[True, merchants[1:] != merchants[:-1]])
+    counts = np.diff(np.r_[starts, rows.size])
+    keep = counts >= RECURRING_MIN_CHARGES
+    if not keep.any():
+        return []
+
+    # Gaps between consecutive charges; the first charge of each merchant gets no gap
+    gaps = np.diff(dates, prepend=dates[0]).astype(np.float64)
+    gaps[starts] = 0
+    gap_mean = np.add.reduceat(gaps, starts) / np.maximum(counts - 1, 1)
+    gap_std = np.sqrt(np.maximum(np.add.reduceat(gaps ** 2, starts) / np.maximum(counts - 1, 1) - gap_mean ** 2, 0))
+
+    amount_mean = np.add.reduceat(amounts, starts) / counts
+    amount_std = np.sqrt(np.maximum(np.add.reduceat(amounts ** 2, starts) / counts - amount_mean ** 2, 0))
+
+    cadence = np.full(starts.size, -1)
+    for i, (_, low, high) in enumerate(CADENCES):
+        cadence[(gap_mean >= low) & (gap_mean <= high)] = i
+    steady = (keep & (cadence >= 0) & (gap_std <= RECURRING_MAX_GAP_STD)
+              & (amount_std <= RECURRING_MAX_AMOUNT_CV * amount_mean))
+
+    found = []
+    for g in np.flatnonzero(steady):
+        first, last = dates[starts[g]], dates[starts[g] + counts[g] - 1]
+        merchant = frame.merchants[merchants[starts[g]]]
+        found.append({
+            "merchant": merchant,
+            "category": frame.merchant_categories[merchants[starts[g]]],
+            "cadence": CADENCES[cadence[g]][0],
+            "charges": int(counts[g]),
+            "average_paise": int(round(amount_mean[g])),
+            "first_date": _date(first),
+            "last_date": _date(last),
+            "next_expected": _date(last + round(gap_mean[g])),
+        })
+    found.sort(key=lambda r: -r["average_paise"])
+    return found
+
+
+def reconcile(frame, total_balance):
+    """
+    Net of the parsed rows against the statement's total in rupees: the text
+    find_total_balance returns ('₹ 1,234.50') or a number (1234.5). None without one.
+    """
+    if isinstance(total_balance, (int, float)):
+        total_balance = f"{total_balance:.2f}"
+    statement_total = parse_amount(total_balance)
+    if statement_total is None:
+        return None
+    net = int(frame.spend.sum() - frame.credits.sum())
+    difference = statement_total - net
+    return {
+        "statement_total_paise": statement_total,
+        "transactions_net_paise": net,
+        "difference_paise": difference,
+        "reconciled": abs(difference) <= RECONCILE_TOLERANCE_PAISE,
+    }
+
+
+def analyze(columns, total_balance=None, top=25):
+    """Every aggregate for a TransactionColumns, as one JSON-ready dict."""
+    frame = StatementFrame(columns)
+    return {
+        "summary": summary(frame),
+        "merchants": spend_by_merchant(frame, top),
+        "categories": spend_by_category(frame),
+        "daily": spend_by_day(frame),
+        "recurring": recurring_charges(frame),
+        "reconciliation": reconcile(frame, total_balance),
+    }
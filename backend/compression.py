@@ -0,0 +1,129 @@
+# backend/compression.py
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+# Far faster than brotli's default of 11, which is meant for static assets, and still smaller than gzip
+BROTLI_QUALITY = 5
+
+
+def _accepted(accept_encoding):
+    """Content codings the client accepts (q > 0), from an Accept-Encoding header."""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+
+class _Gzip:
+    name = "gzip"
+
+    def __init__(self, level):
+        # wbits=31: a gzip header and trailer around the deflate stream
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        # A sync flush ends each chunk on a byte boundary, so the client can decode it right away
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data=b""):
+        return self._z.compress(data) + self._z.flush()
+
+
+class _Brotli:
+    name = "br"
+
+    def __init__(self, quality):
+        self._b = brotli.Compressor(quality=quality)
+
+    def chunk(self, data):
+        return self._b.process(data) + self._b.flush()
+
+    def finish(self, data=b""):
+        return self._b.process(data) + self._b.finish()
+
+
+class ResponseCompressor:
+    """
+    Compresses JSON, NDJSON, CSV and text responses with brotli (when the
+    package is installed and the client accepts it) or gzip. Buffered bodies
+    under `min_bytes` are left alone; streamed bodies are compressed chunk by
+    chunk and flushed after each one, so rows still reach the client as they
+    are parsed. Level 0 turns compression off.
+    """
+
+    def __init__(self, level=6, min_bytes=1024):
+        self.level = level
+        self.min_bytes = min_bytes
+
+    @property
+    def enabled(self):
+        return self.level > 0
+
+    def _encoder(self, accept_encoding):
+        accepted = _accepted(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return _Brotli(BROTLI_QUALITY)
+        if "gzip" in accepted:
+            return _Gzip(self.level)
+        return None
+
+    def compress(self, response, accept_encoding):
+        """Compress a Flask response in place for a client sending `accept_encoding`; returns it."""
+        if (not self.enabled or response.direct_passthrough or response.status_code < 200
+                or response.status_code in (204, 304) or "Content-Encoding" in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoder = self._encoder(accept_encoding)
+        if encoder is None:
+            return response
+
+        if response.is_streamed:
+            body = response.response
+
+            def compressed():
+                try:
+                    for data in body:
+                        if isinstance(data, str):
+                            data = data.encode()
+                        out = encoder.chunk(data)
+                        if out:
+                            yield out
+                    yield encoder.finish()
+                finally:
+                    # The original body still gets closed, so its own cleanup runs as before
+                    if hasattr(body, "close"):
+                        body.close()
+
+            response.response = compressed()
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_bytes:
+                return response
+            response.set_data(encoder.finish(data))
+        response.headers["Content-Encoding"] = encoder.name
+        return response
+
+
+def compressor_from_env():
+    """Build the ResponseCompressor from COMPRESS_* environment variables."""
+    return ResponseCompressor(
+        level=int(os.environ.get("COMPRESS_LEVEL", 6)),
+        min_bytes=int(os.environ.get("COMPRESS_MIN_BYTES", 1024)),
+    )
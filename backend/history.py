@@ -0,0 +1,183 @@
+# backend/history.py
+import os
+import sqlite3
+import threading
+import time
+
+from backend.parser_engine.records import Transaction
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS statements ("
+    " id INTEGER PRIMARY KEY, pdf_sha256 TEXT NOT NULL UNIQUE, filename TEXT, bank TEXT,"
+    " card_last4 TEXT NOT NULL, billing_cycle TEXT, payment_due_date TEXT, total_balance TEXT,"
+    " transactions INTEGER NOT NULL, ingested REAL NOT NULL)",
+    # Dates are ISO strings so they sort and range-compare as text
+    "CREATE TABLE IF NOT EXISTS transactions ("
+    " id INTEGER PRIMARY KEY, statement_id INTEGER NOT NULL REFERENCES statements (id),"
+    " card_last4 TEXT NOT NULL, date TEXT, description TEXT NOT NULL, merchant TEXT NOT NULL,"
+    " amount_paise INTEGER, type TEXT NOT NULL, occurrence INTEGER,"
+    " UNIQUE (card_last4, date, amount_paise, description, occurrence))",
+    "CREATE INDEX IF NOT EXISTS transactions_card_date ON transactions (card_last4, date)",
+    "CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date)",
+    "CREATE INDEX IF NOT EXISTS transactions_merchant_date ON transactions (merchant, date)",
+    "CREATE INDEX IF NOT EXISTS statements_card ON statements (card_last4)",
+)
+
+QUERY_MAX_LIMIT = 1000
+
+
+class HistoryStore:
+    """
+    Parsed statements and their transactions in a local SQLite file, so
+    cross-statement questions don't need the PDFs again. A statement whose
+    PDF hash is already stored is skipped; a transaction is stored once per
+    (card last4, date, amount, description, occurrence), however many statements
+    repeat it. `occurrence` numbers identical rows within one statement, so two
+    equal charges on the same day are both kept; it is NULL when the card's
+    last 4 digits are unknown, and NULLs never collide, so those rows are never deduplicated.
+    Without a db_path the store is disabled and every call is a no-op.
+    """
+
+    def __init__(self, db_path=None):
+        self._db = None
+        self._lock = threading.Lock()
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            self._db.commit()
+
+    @property
+    def enabled(self):
+        return self._db is not None
+
+    # --- Ingest ---
+    def ingest(self, digest, filename, bank, extracted_data):
+        """
+        Store one parse result in a single transaction, rows bulk-inserted with
+        executemany; returns {statement_id, new, transactions_added, duplicates}
+        (None when disabled).
+        """
+        if not self._db:
+            return None
+        from backend.analytics import merchant_key  # numpy stays unloaded until the first ingest
+
+        transactions = extracted_data.get("transactions") or []
+        last4 = extracted_data.get("last_4_digits") or ""
+        with self._lock:
+            row = self._db.execute("SELECT id FROM statements WHERE pdf_sha256 = ?", (digest,)).fetchone()
+            if row:
+                return {"statement_id": row[0], "new": False, "transactions_added": 0,
+                        "duplicates": len(transactions)}
+            with self._db:
+                statement_id = self._db.execute(
+                    "INSERT INTO statements (pdf_sha256, filename, bank, card_last4, billing_cycle,"
+                    " payment_due_date, total_balance, transactions, ingested) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (digest, filename, bank, last4, extracted_data.get("billing_cycle"),
+                     extracted_data.get("payment_due_date"), extracted_data.get("total_balance"),
+                     len(transactions), time.time()),
+                ).lastrowid
+                before = self._db.total_changes
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO transactions (statement_id, card_last4, date, description,"
+                    " merchant, amount_paise, type, occurrence) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    _transaction_rows(statement_id, last4, transactions, merchant_key),
+                )
+                added = self._db.total_changes - before
+            # Refresh planner statistics once tables have grown, so merchant and card filters pick their index
+            self._db.execute("PRAGMA optimize=0x10002")
+        return {"statement_id": statement_id, "new": True, "transactions_added": added,
+                "duplicates": len(transactions) - added}
+
+    # --- Queries ---
+    def transactions(self, card=None, start=None, end=None, merchant=None, text=None, limit=100, offset=0):
+        """
+        Stored transactions, newest first. `start`/`end` are inclusive ISO
+        dates, `merchant` is a prefix of the normalized merchant name (so it
+        can use the index) and `text` a substring of the raw description.
+        Returns (rows, total matches, summed paise).
+        """
+        if not self._db:
+            return [], 0, 0
+        clauses, params = [], []
+        # With a merchant filter, unary + keeps the card/date index from being chosen just to
+        # skip the ORDER BY sort; a merchant prefix is far more selective
+        t = "+t." if merchant else "t."
+        if card:
+            clauses.append(t + "card_last4 = ?")
+            params.append(card)
+        if start:
+            clauses.append(t + "date >= ?")
+            params.append(start)
+        if end:
+            clauses.append(t + "date <= ?")
+            params.append(end)
+        if merchant:
+            from backend.analytics import merchant_key
+
+            prefix = merchant_key(merchant)
+            clauses.append("t.merchant >= ? AND t.merchant < ?")
+            params += [prefix, prefix + "\uffff"]
+        if text:
+            clauses.append("t.description LIKE ? ESCAPE '\\'")
+            params.append("%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        with self._lock:
+            total, paise = self._db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(t.amount_paise), 0) FROM transactions t{where}", params).fetchone()
+            rows = self._db.execute(
+                "SELECT t.date, t.description, t.merchant, t.amount_paise, t.type, t.card_last4,"
+                " s.bank, s.pdf_sha256 FROM transactions t JOIN statements s ON s.id = t.statement_id"
+                + where
+                + " ORDER BY t.date DESC, t.id DESC LIMIT ? OFFSET ?",
+                params + [min(limit, QUERY_MAX_LIMIT), offset],
+            ).fetchall()
+        keys = ("date", "description", "merchant", "amount_paise", "type", "card_last4", "bank", "statement")
+        return [dict(zip(keys, r)) for r in rows], total, paise
+
+    def statements(self, card=None):
+        """Stored statements, most recently ingested first."""
+        if not self._db:
+            return []
+        sql = ("SELECT id, pdf_sha256, filename, bank, card_last4, billing_cycle, payment_due_date,"
+               " total_balance, transactions, ingested FROM statements")
+        params = []
+        if card:
+            sql += " WHERE card_last4 = ?"
+            params.append(card)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY ingested DESC", params).fetchall()
+        keys = ("id", "pdf_sha256", "filename", "bank", "card_last4", "billing_cycle", "payment_due_date",
+                "total_balance", "transactions", "ingested")
+        return [dict(zip(keys, r)) for r in rows]
+
+    # --- Stats ---
+    def stats(self):
+        if not self._db:
+            return {"enabled": False}
+        with self._lock:
+            statements = self._db.execute("SELECT COUNT(*) FROM statements").fetchone()[0]
+            transactions = self._db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        return {"enabled": True, "statements": statements, "transactions": transactions}
+
+
+def _transaction_rows(statement_id, last4, rows, merchant_key):
+    seen = {}
+    for row in rows:
+        tx = Transaction.from_row(row)
+        date = tx.date.isoformat() if tx.date else None
+        occurrence = None
+        if last4:
+            key = (date, tx.amount_paise, tx.description)
+            occurrence = seen[key] = seen.get(key, -1) + 1
+        yield (statement_id, last4, date, tx.description, merchant_key(tx.description),
+               tx.amount_paise, tx.type.value, occurrence)
+
+
+def history_from_env():
+    """Build the HistoryStore from HISTORY_DB (unset keeps it disabled)."""
+    return HistoryStore(os.environ.get("HISTORY_DB") or None)
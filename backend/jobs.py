@@ -0,0 +1,173 @@
+# backend/jobs.py
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+import urllib.request
+from urllib.parse import urlparse
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+class QueueFull(Exception):
+    """The job queue is at capacity; the client should retry later."""
+
+
+def is_local_url(url):
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https") and parsed.hostname in LOCAL_HOSTS
+
+
+class JobQueue:
+    """
+    Bounded queue of parse jobs served by a fixed set of worker threads.
+    `run(data, filename, bank_hint)` does the actual work and returns a JSON-serialisable result.
+    Finished jobs are kept for `retention` seconds so clients can poll them.
+    """
+
+    def __init__(self, run, workers=2, max_queue=32, retention=3600):
+        self.run = run
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self.closed = False
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    # --- Submission & polling ---
+    def submit(self, data, filename, webhook=None, bank_hint=None):
+        """
+        Queue a job and return its id; raises QueueFull when at capacity or draining.
+        `bank_hint` (the triage's guess) is handed to run().
+        """
+        if self.closed:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull("Job queue is shutting down")
+        self._ensure_workers()
+        self._purge()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "filename": filename,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "webhook": webhook,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, data, filename, bank_hint))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+                self.rejected += 1
+            raise QueueFull(f"Job queue is full ({self.max_queue} pending)")
+        return job_id
+
+    def get(self, job_id):
+        """Public view of a job, or None if it is unknown or has expired."""
+        self._purge()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {k: v for k, v in job.items() if k != "webhook"}
+
+    # --- Workers ---
+    def _worker(self):
+        while True:
+            job_id, data, filename, bank_hint = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job:
+                    job["status"] = "running"
+                    job["started_at"] = time.time()
+            try:
+                result = self.run(data, filename, bank_hint)
+                update = {"status": "done", "result": result}
+            except Exception as e:
+                update = {"status": "failed", "error": str(e)}
+            with self._lock:
+                if update["status"] == "done":
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                job = self._jobs.get(job_id)
+                if job:
+                    job.update(update, finished_at=time.time())
+            self._queue.task_done()
+            if job and job.get("webhook"):
+                self._notify(job)
+
+    def _notify(self, job):
+        body = json.dumps(self.get(job["job_id"])).encode()
+        req = urllib.request.Request(job["webhook"], data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(req, timeout=5).close()
+        except Exception as e:
+            print(f"⚠️ Webhook for job {job['job_id']} failed:", e)
+
+    def _purge(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            expired = [k for k, j in self._jobs.items() if j.get("finished_at", cutoff) < cutoff]
+            for k in expired:
+                del self._jobs[k]
+
+    # --- Shutdown ---
+    def drain(self, timeout=None):
+        """
+        Stop taking jobs and wait up to `timeout` seconds for the queued and
+        running ones to finish; returns True if none are left.
+        """
+        self.closed = True
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    # --- Metrics ---
+    def stats(self):
+        with self._lock:
+            running = sum(1 for j in self._jobs.values() if j["status"] == "running")
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue": self.max_queue,
+                "running": running,
+                "workers": self.workers,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "retained_jobs": len(self._jobs),
+            }
+
+
+def job_queue_from_env(run):
+    """Build the JobQueue from JOB_* environment variables."""
+    return JobQueue(
+        run,
+        workers=int(os.environ.get("JOB_WORKERS", 2)),
+        max_queue=int(os.environ.get("JOB_QUEUE_SIZE", 32)),
+        retention=float(os.environ.get("JOB_RETENTION", 3600)),
+    )
@@ -0,0 +1,129 @@
+# backend/metrics.py
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PAGE_BUCKETS = ((1, "1"), (5, "2-5"), (10, "6-10"), (20, "11-20"))
+
+
+def page_bucket(pages):
+    """Coarse page-count label, so the label set stays small."""
+    if pages is None:
+        return "unknown"
+    for limit, name in PAGE_BUCKETS:
+        if pages <= limit:
+            return name
+    return "21+"
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, ('le', bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, ('le', '+Inf'))} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series['count']}")
+        return lines
+
+
+def render_gauges(prefix, values, help_text):
+    """Gauge lines for a flat dict of numbers, e.g. a stats() snapshot."""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}"
+        lines += [f"# HELP {name} {help_text} ({key})", f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+# --- Parser metrics ---
+STAGE_SECONDS = Histogram(
+    "parser_stage_seconds",
+    "Time spent in each parse stage",
+    labels=("stage", "bank", "pages", "outcome"),
+)
+UPLOAD_SECONDS = Histogram(
+    "upload_request_seconds",
+    "End-to-end /upload handling time",
+    labels=("bank", "pages", "outcome"),
+)
+PARSES_TOTAL = Counter(
+    "parses_total",
+    "Statements handled (upload, batch and jobs) by outcome",
+    labels=("bank", "outcome"),
+)
+
+
+def record_parse(stats, outcome, total_seconds=None):
+    """Feed one parse's StageTimer dict into the metrics; total_seconds is the /upload request time."""
+    labels = stats.get("labels", {})
+    bank = labels.get("bank", "unknown")
+    pages = page_bucket(labels.get("pages"))
+    for stage, seconds in stats.get("stages", {}).items():
+        STAGE_SECONDS.observe(seconds, stage=stage, bank=bank, pages=pages, outcome=outcome)
+    if total_seconds is not None:
+        UPLOAD_SECONDS.observe(total_seconds, bank=bank, pages=pages, outcome=outcome)
+    PARSES_TOTAL.inc(bank=bank, outcome=outcome)
+
+
+def render_metrics(*extra_lines):
+    lines = STAGE_SECONDS.render() + UPLOAD_SECONDS.render() + PARSES_TOTAL.render()
+    for chunk in extra_lines:
+        lines += chunk
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,194 @@
+# backend/parser_engine/document.py
+from .instrumentation import timed
+from .ocr import get_ocr, lacks_text_layer
+from .redaction import get_redactor
+
+# Markers bounding the transaction section in every supported layout
+SECTION_START = "TRANSACTION DETAILS"
+SECTION_END = "REWARDS SUMMARY"
+
+
+class StatementDocument:
+    """
+    A PDF statement opened once with pdfplumber.
+    Page text, words and tables are computed on first use and cached,
+    so bank detection and every parser share a single layout analysis.
+    Pages are only extracted when something asks for them: callers that walk
+    pages in order can stop early and never pay for the rest of the file.
+    With keep_pages=False, iter_pages() drops each page's caches once the
+    walk moves past it, so memory stays flat however long the statement is.
+    When OCR is configured, pages without a text layer get their text from
+    it instead; text pages never touch the OCR engine.
+    With a redactor (REDACT_PII, on by default), each page's text is masked
+    once as it is extracted, so detection, header fields and every parser
+    only ever see the redacted text.
+    """
+
+    def __init__(self, source, keep_pages=True, ocr=None, redactor=None):
+        self.source = source
+        self.keep_pages = keep_pages
+        self.ocr = ocr if ocr is not None else get_ocr()
+        self.redactor = redactor if redactor is not None else get_redactor()
+        # Indexes of pages whose text came from OCR
+        self.ocr_pages = []
+        self._ocr_queue = None
+        self._ocr_futures = {}
+        self._pdf_bytes = None
+        # Called as listener(index, text) the first time iter_pages() reaches a page
+        self.page_listeners = []
+        self._announced = set()
+        with timed("pdf_open"):
+            # Imported here so loading the parser engine doesn't pull in pdfplumber/pdfminer
+            import pdfplumber
+
+            self._pdf = pdfplumber.open(source)
+        self.pages = self._pdf.pages
+        self._text = {}
+        self._tables = {}
+        self._words = {}
+        self._full_text = None
+
+    # --- Context manager ---
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._pdf.close()
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    # --- Per-page cached views ---
+    def page_text(self, index):
+        if index not in self._text:
+            with timed("extract_text"):
+                text = self.pages[index].extract_text() or ""
+            if not text.strip() and self.ocr is not None and lacks_text_layer(self.pages[index].page_obj):
+                text = self._ocr_text(index)
+            if self.redactor is not None:
+                with timed("redact"):
+                    text = self.redactor.redact(text)
+            self._text[index] = text
+        return self._text[index]
+
+    def redact(self, text):
+        """`text` with card numbers, emails and phone numbers masked, for text that didn't come from page_text()."""
+        return text if self.redactor is None else self.redactor.redact(text)
+
+    def _ocr_text(self, index):
+        if self._ocr_queue is None:
+            # First scanned page: line up every later scan so they're recognized in parallel
+            self._ocr_queue = [i for i in range(index + 1, self.page_count)
+                               if lacks_text_layer(self.pages[i].page_obj)]
+            # pdfium renders from its own copy; the pdfminer stream stays with this thread
+            if isinstance(self.source, str) or hasattr(self.source, "__fspath__"):
+                with open(self.source, "rb") as f:
+                    self._pdf_bytes = f.read()
+            else:
+                position = self.source.tell()
+                self.source.seek(0)
+                self._pdf_bytes = self.source.read()
+                self.source.seek(position)
+        future = self._ocr_futures.pop(index, None) or self._submit_ocr(index)
+        # Keep the pool busy, but don't rasterize the whole document ahead of the reader
+        while self._ocr_queue and len(self._ocr_futures) < self.ocr.workers * 2:
+            i = self._ocr_queue.pop(0)
+            self._ocr_futures[i] = self._submit_ocr(i)
+        with timed("ocr"):
+            text = future.result()
+        self.ocr_pages.append(index)
+        return text
+
+    def _submit_ocr(self, index):
+        return self.ocr.submit(self.pages[index].page_obj, self._pdf_bytes, index)
+
+    def page_words(self, index):
+        if index not in self._words:
+            with timed("extract_words"):
+                self._words[index] = self.pages[index].extract_words()
+        return self._words[index]
+
+    def page_tables(self, index, table_settings=None):
+        key = (index, tuple(sorted((table_settings or {}).items())))
+        if key not in self._tables:
+            with timed("extract_tables"):
+                self._tables[key] = self.pages[index].extract_tables(table_settings=table_settings)
+        return self._tables[key]
+
+    def release_page(self, index):
+        """Forget everything cached for one page, including pdfplumber's layout objects."""
+        self._text.pop(index, None)
+        self._words.pop(index, None)
+        for key in [k for k in self._tables if k[0] == index]:
+            del self._tables[key]
+        self.pages[index].close()
+
+    # --- Whole-document views ---
+    @property
+    def text(self):
+        """Full statement text, one line break after every non-empty page."""
+        if self._full_text is None:
+            parts = [self.page_text(i) for i in range(self.page_count)]
+            self._full_text = "".join(p + "\n" for p in parts if p)
+        return self._full_text
+
+    # --- Lazy, page-at-a-time views ---
+    def iter_page_texts(self):
+        """Yield (index, text) one page at a time, extracting each page on demand."""
+        for i in range(self.page_count):
+            yield i, self.page_text(i)
+
+    def iter_pages(self):
+        """
+        Page indexes in order, for parsers that work a page at a time. Each
+        page's text goes to page_listeners the first time it is reached, and
+        unless keep_pages is set the page is released when the caller moves on.
+        """
+        for i in range(self.page_count):
+            if self.page_listeners and i not in self._announced:
+                self._announced.add(i)
+                text = self.page_text(i)
+                for listener in self.page_listeners:
+                    listener(i, text)
+            try:
+                yield i
+            finally:
+                if not self.keep_pages:
+                    self.release_page(i)
+
+    def section_pages(self, start=SECTION_START, end=SECTION_END):
+        """
+        Indexes of the pages holding the section that opens with `start`,
+        up to and including the page where `end` appears. Pages after the
+        section (terms, offers, marketing) are never extracted.
+        """
+        pages = []
+        for i, page_text in self.iter_page_texts():
+            if not pages:
+                if start not in page_text:
+                    continue
+                page_text = page_text[page_text.index(start):]
+            pages.append(i)
+            if end in page_text:
+                break
+        return pages
+
+    def statement_text(self, start=SECTION_START, end=SECTION_END):
+        """
+        Text from the first page through the end of the transaction section.
+        Falls back to the full text when the section can't be found.
+        """
+        pages = self.section_pages(start, end)
+        if not pages:
+            return self.text
+        parts = [self.page_text(i) for i in range(pages[-1] + 1)]
+        return "".join(p + "\n" for p in parts if p)
+
+
+def open_document(source, keep_pages=True, ocr=None, redactor=None):
+    """Open a statement PDF (path or file-like object) as a StatementDocument."""
+    return StatementDocument(source, keep_pages=keep_pages, ocr=ocr, redactor=redactor)
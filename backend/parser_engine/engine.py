@@ -0,0 +1,360 @@
+# backend/parser_engine/engine.py
+import bisect
+import itertools
+import re
+
+from .instrumentation import timed, timed_iter
+
+MULTILINE_DAY_MONTH_RE = re.compile(r"^\d{1,2}\s+[A-Za-z]{3}$")
+MULTILINE_YEAR_RE = re.compile(r"^\d{4}$")
+DETAILS_RE = re.compile(
+    r"(.+?)\s+(\d{1,3}(?:,\d{3})*(?:\.\d{2}))\s+(Purchase|Cash\s*Advance|Finance\s*Charge)",
+    re.IGNORECASE,
+)
+HAS_DIGIT_RE = re.compile(r"\d")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Word-layout engine tolerances, in PDF points
+WORD_LINE_TOLERANCE = 3   # words whose tops differ by at most this share a line
+HEADER_LABEL_GAP = 10     # a wider gap separates two header labels
+CONTINUATION_GAP = 4      # a date/description line this close below a row wraps onto it
+LEARN_ROWS = 50           # rows under the header used to locate column gutters
+
+
+# --- Page walks (lazy, so rows can be streamed while later pages are still unread) ---
+def _section_walk(doc, start, end):
+    """
+    Pages from the first one containing `start` through the one where `end`
+    appears: doc.section_pages(), but pulled from doc.iter_pages() on demand.
+    """
+    started = False
+    for i in doc.iter_pages():
+        text = doc.page_text(i)
+        if not started:
+            if start not in text:
+                continue
+            started = True
+            text = text[text.index(start):]
+        yield i
+        if end in text:
+            return
+
+
+def _statement_walk(doc, start, end):
+    """Pages covered by doc.statement_text(): through the section's end, or every page if there is no section."""
+    started = False
+    for i in doc.iter_pages():
+        text = doc.page_text(i)
+        yield i
+        if not started and start in text:
+            started = True
+            text = text[text.index(start):]
+        if started and end in text:
+            return
+
+
+# --- Transaction engines ---
+# Each engine is a generator over (doc, profile) yielding row dicts page by page.
+def table_transactions(doc, profile):
+    """Rows of the ruled 'Date | Description | Amount | Type' table on the section's pages."""
+    found = False
+    for page_index in _section_walk(doc, *profile.section):
+        for table in doc.page_tables(page_index, table_settings=profile.table_settings):
+            if not table or len(table) < 2:
+                continue
+            headers = [h.strip().lower() if h else "" for h in table[0]]
+            if "date" in headers and "description" in headers:
+                for row in table[1:]:
+                    if len(row) < 4:
+                        continue
+                    date, desc, amount, tx_type = row[:4]
+                    if not HAS_DIGIT_RE.search(amount or ""):
+                        continue
+                    found = True
+                    yield {
+                        "date": (date or "").strip(),
+                        # Cells come from the page layout, not the (already redacted) page text
+                        "description": doc.redact(WHITESPACE_RE.sub(" ", (desc or "").strip())),
+                        "amount": (amount or "").replace(",", "").strip(),
+                        "type": (tx_type or "").strip()
+                    }
+
+    # --- Fallback regex extraction if no tables found ---
+    if not found:
+        yield from line_transactions(doc, profile)
+
+
+def line_transactions(doc, profile):
+    """One transaction per line matching the profile's line pattern."""
+    return timed_iter("regex", _line_transactions(doc, profile))
+
+
+def _line_transactions(doc, profile):
+    for page_index in _statement_walk(doc, *profile.section):
+        for line in doc.page_text(page_index).splitlines():
+            m = profile.line_re.search(line)
+            if m:
+                yield {
+                    "date": m.group(1).strip(),
+                    "description": m.group(2).strip(),
+                    "amount": m.group(3).replace(",", "").strip(),
+                    "type": m.group(4).strip(),
+                }
+
+
+def words_transactions(doc, profile):
+    """
+    Rows of the 'Date | Description | Amount | Type' table rebuilt from word
+    coordinates: words are clustered into lines by y and binned into columns,
+    skipping pdfplumber's edge and intersection detection entirely. Column
+    boundaries are learned from the header row and the gutters between the
+    cells under it, and kept on the profile keyed by the header's labels and
+    their x-positions: a later statement with the same header skips the
+    learning, one whose columns moved learns its own. Without a header row,
+    or if no rows come out, the table engine runs.
+    """
+    found = False
+    labels, lines = _find_header(_section_lines(doc, profile))
+    if labels:
+        key = tuple((l["text"], round(l["x0"]), round(l["x1"])) for l in labels)
+        columns = profile.word_layout(key)
+        if columns is None:
+            columns, lines = _learn_columns(labels, lines)
+            profile.learn_word_layout(key, columns)
+        for row in timed_iter("layout", _word_rows(lines, columns)):
+            found = True
+            yield _redact_row(doc, row)
+    if not found:
+        yield from table_transactions(doc, profile)
+
+
+def _redact_row(doc, row):
+    # Words come from the page layout, not the (already redacted) page text
+    row["description"] = doc.redact(row["description"])
+    return row
+
+
+def _word_lines(words):
+    """Cluster a page's words into lines by their top coordinate, each sorted left to right."""
+    lines = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and word["top"] - lines[-1][0]["top"] <= WORD_LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+
+def _section_lines(doc, profile):
+    """Yield (page index, words) for every line between the section markers."""
+    start, end = profile.section
+    for n, page_index in enumerate(_section_walk(doc, start, end)):
+        in_section = n > 0
+        for line in _word_lines(doc.page_words(page_index)):
+            line_text = " ".join(w["text"] for w in line)
+            if not in_section:
+                in_section = start in line_text
+                continue
+            if end in line_text:
+                return
+            yield page_index, line
+
+
+def _header_labels(line):
+    """The column labels of `line` if it is the table's header row, else None."""
+    labels = []
+    for word in line:
+        if labels and word["x0"] - labels[-1]["x1"] <= HEADER_LABEL_GAP:
+            labels[-1]["x1"] = word["x1"]
+            labels[-1]["text"] += " " + word["text"].lower()
+        else:
+            labels.append({"x0": word["x0"], "x1": word["x1"], "text": word["text"].lower()})
+    names = [l["text"] for l in labels]
+    if len(labels) < 4 or "date" not in names or "description" not in names:
+        return None
+    return labels
+
+
+def _find_header(lines):
+    """The first header row's labels in `lines` and an iterator over the lines after it, or (None, empty)."""
+    lines = iter(lines)
+    for _, line in lines:
+        labels = _header_labels(line)
+        if labels:
+            return labels, lines
+    return None, iter(())
+
+
+def _learn_columns(labels, lines):
+    """
+    Column boundaries (x positions) for a header row's `labels`, plus an
+    iterator over `lines` (the lines under the header) from the start again.
+    Between each pair of label centres the boundary sits in the widest
+    gutter left by the rows below, so left-aligned and centred headers both
+    work. Only the first LEARN_ROWS rows are looked at, and buffered until
+    they are replayed.
+    """
+    buffered = []
+    rows = []
+    for item in lines:
+        buffered.append(item)
+        if item[1][0]["text"][:1].isdigit():
+            rows.append(item[1])
+            if len(rows) >= LEARN_ROWS:
+                break
+
+    gaps = []
+    reach = None
+    for x0, x1 in sorted((w["x0"], w["x1"]) for words in rows for w in words):
+        if reach is not None and x0 > reach:
+            gaps.append((reach, x0))
+        reach = x1 if reach is None else max(reach, x1)
+
+    boundaries = []
+    for left, right in zip(labels, labels[1:]):
+        low, high = (left["x0"] + left["x1"]) / 2, (right["x0"] + right["x1"]) / 2
+        inside = [g for g in gaps if low < (g[0] + g[1]) / 2 < high]
+        boundary = (left["x1"] + right["x0"]) / 2
+        if inside:
+            lo, hi = max(inside, key=lambda g: g[1] - g[0])
+            boundary = (lo + hi) / 2
+        if boundaries and boundary <= boundaries[-1]:
+            boundary = (left["x1"] + right["x0"]) / 2
+        boundaries.append(boundary)
+    return tuple(boundaries), itertools.chain(buffered, lines)
+
+
+def _cells(line, columns):
+    cells = [[] for _ in range(len(columns) + 1)]
+    for word in line:
+        cells[bisect.bisect_right(columns, (word["x0"] + word["x1"]) / 2)].append(word["text"])
+    return [" ".join(c) for c in cells]
+
+
+def _word_rows(lines, columns):
+    # A row is only yielded once the next line shows it hasn't wrapped
+    pending = None
+    previous_page = previous_bottom = None
+    for page_index, line in lines:
+        date, desc, amount, tx_type = (_cells(line, columns) + ["", "", "", ""])[:4]
+        bottom = max(w["bottom"] for w in line)
+        if HAS_DIGIT_RE.search(date) and HAS_DIGIT_RE.search(amount):
+            if pending is not None:
+                yield pending
+            pending = {
+                "date": date.strip(),
+                "description": WHITESPACE_RE.sub(" ", desc.strip()),
+                "amount": amount.replace(",", "").strip(),
+                "type": tx_type.strip(),
+            }
+        elif (pending is not None and (date or desc) and not (amount or tx_type)
+              and page_index == previous_page and line[0]["top"] - previous_bottom <= CONTINUATION_GAP):
+            # Date or description wrapped onto a second line inside its cell ('15 Sep' / '2025')
+            if date:
+                pending["date"] = f"{pending['date']} {date.strip()}"
+            if desc:
+                pending["description"] = WHITESPACE_RE.sub(" ", f"{pending['description']} {desc}")
+        elif pending is not None:
+            yield pending
+            pending = None
+        previous_page, previous_bottom = page_index, bottom
+    if pending is not None:
+        yield pending
+
+
+def multiline_transactions(doc, profile):
+    """
+    Rows whose date is split over lines, e.g.
+        15 Sep
+        2025
+        Amazon India 2,499.00 Purchase
+    merged into single entries; one-line rows are read as well.
+    """
+    return timed_iter("regex", _multiline_transactions(_section_text_lines(doc, *profile.section), profile))
+
+
+def _section_text_lines(doc, start, end):
+    """Non-blank, stripped text lines between the section markers (matched case-insensitively)."""
+    start, end = start.lower(), end.lower()
+    inside = False
+    for page_index in doc.iter_pages():
+        text = doc.page_text(page_index)
+        lowered = text.lower()
+        if not inside:
+            pos = lowered.find(start)
+            if pos == -1:
+                continue
+            inside = True
+            text, lowered = text[pos + len(start):], lowered[pos + len(start):]
+        pos = lowered.find(end)
+        if pos != -1:
+            text = text[:pos]
+        for line in text.splitlines():
+            if line.strip():
+                yield line.strip()
+        if pos != -1:
+            return
+
+
+def _multiline_transactions(lines, profile):
+    lines = iter(lines)
+    window = []  # the current line and up to two after it
+    while True:
+        while len(window) < 3:
+            line = next(lines, None)
+            if line is None:
+                break
+            window.append(line)
+        if not window:
+            return
+        line = window[0]
+
+        # Look for line that matches "15 Sep" or "01 Oct" etc.
+        if MULTILINE_DAY_MONTH_RE.match(line) and len(window) > 1:
+            next_line = window[1]
+            # if next line is year (e.g., 2025)
+            if MULTILINE_YEAR_RE.match(next_line) and len(window) > 2:
+                date = f"{line} {next_line}"
+                m = DETAILS_RE.search(window[2])
+                if m:
+                    yield {
+                        "date": date.strip(),
+                        "description": m.group(1).strip(),
+                        "amount": m.group(2).replace(",", "").strip(),
+                        "type": m.group(3).strip(),
+                    }
+                del window[:3]
+                continue
+
+        # Handle single-line date format (like "01 Oct 2025 ...")
+        m2 = profile.line_re.match(line)
+        if m2:
+            yield {
+                "date": m2.group(1).strip(),
+                "description": m2.group(2).strip(),
+                "amount": m2.group(3).replace(",", "").strip(),
+                "type": m2.group(4).strip(),
+            }
+        del window[0]
+
+
+TRANSACTION_ENGINES = {
+    "table": table_transactions,
+    "multiline": multiline_transactions,
+    "words": words_transactions,
+}
+
+
+def parse_with_profile(doc, profile):
+    """Header fields and transactions of a statement, driven entirely by its bank profile."""
+    with timed("parse"):
+        text = doc.statement_text(*profile.section)
+        with timed("regex"):
+            data = profile.fields.extract(text)
+        data["transactions"] = list(iter_profile_transactions(doc, profile))
+    return data
+
+
+def iter_profile_transactions(doc, profile):
+    """The profile's transaction engine as a lazy row iterator."""
+    return TRANSACTION_ENGINES[profile.transaction_engine](doc, profile)
@@ -0,0 +1,168 @@
+# backend/parser_engine/fields.py
+import heapq
+import re
+from functools import lru_cache
+
+# Characters re.IGNORECASE folds onto ASCII letters but str.lower() doesn't map 1:1
+_LOWER_UNSAFE = re.compile("[\u0130\u0131\u017f]")
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern, flags=0):
+    """
+    re.compile() with a cache of its own that outlives re's small one, so
+    reloading the rules file only compiles the patterns that changed.
+    """
+    return re.compile(pattern, flags)
+
+
+class FieldRule:
+    """
+    One way of finding a field: a regex compiled once, plus the lowercase
+    keywords ("anchors") any match must start with. Rules without anchors
+    fall back to a plain re.search over the text.
+    """
+
+    def __init__(self, pattern, anchors=(), group=1, flags=re.IGNORECASE, clean=str.strip):
+        self.regex = compile_pattern(pattern, flags)
+        self.anchors = tuple(a.lower() for a in anchors)
+        self.group = group
+        self.clean = clean
+
+    def value(self, match):
+        value = match.group(self.group)
+        return self.clean(value) if self.clean else value
+
+
+class FieldExtractor:
+    """
+    Finds many header fields in one pass over the statement text.
+
+    Every field is a list of FieldRules in priority order; a field takes the
+    value of its first rule that matches anywhere, exactly like running
+    re.search for each rule in turn. Instead of one full scan per rule, a
+    single keyword-index pass finds every anchor position and the rules are
+    only tried there: the leftmost match of an anchored rule always starts at
+    one of its anchors, so results are identical.
+    """
+
+    def __init__(self, fields):
+        self.fields = {name: list(rules) for name, rules in fields.items()}
+
+        # Anchors that are a prefix of another share a scan position with it
+        tokens = {a for rules in self.fields.values() for r in rules for a in r.anchors}
+        roots = sorted(t for t in tokens if not any(o != t and t.startswith(o) for o in tokens))
+        root_of = {t: next(r for r in roots if t.startswith(r)) for t in tokens}
+
+        self._roots = roots
+        # Once a field's first anchored rule has matched, later positions can't change its value
+        self._first_anchored = {
+            name: next((i for i, r in enumerate(rules) if r.anchors), None)
+            for name, rules in self.fields.items()
+        }
+        self._by_root = [[] for _ in roots]
+        for name, rules in self.fields.items():
+            for priority, rule in enumerate(rules):
+                for root in {root_of[a] for a in rule.anchors}:
+                    self._by_root[roots.index(root)].append((name, priority, rule))
+
+        # Roots never share a start position, so one alternation of lookaheads sees them all.
+        # Used when the str.find index below can't be trusted to agree with re.IGNORECASE.
+        alternatives = "|".join(f"(?P<a{i}>{re.escape(t)})" for i, t in enumerate(roots))
+        self._scanner = re.compile(f"(?=(?:{alternatives}))", re.IGNORECASE) if roots else None
+        self._ascii_roots = all(t.isascii() for t in roots)
+
+    def _anchor_positions(self, text):
+        """Yield (position, root index) for every anchor occurrence, in text order."""
+        if not self._ascii_roots or _LOWER_UNSAFE.search(text):
+            for m in self._scanner.finditer(text):
+                yield m.start(), int(m.lastgroup[1:])
+            return
+
+        lowered = text.lower()
+
+        def occurrences(index, token):
+            pos = lowered.find(token)
+            while pos != -1:
+                yield pos, index
+                pos = lowered.find(token, pos + 1)
+
+        yield from heapq.merge(*(occurrences(i, t) for i, t in enumerate(self._roots)))
+
+    def extract(self, text, names=None):
+        """Return {field: value} for `names` (default: every field)."""
+        return {name: value for name, (_, value) in self.extract_ranked(text, names).items()}
+
+    def extract_ranked(self, text, names=None):
+        """Like extract(), but each value comes as (priority of the rule that matched, value); (None, None) if none did."""
+        wanted = [n for n in self.fields if names is None or n in names]
+        found = {}
+        unresolved = {n for n in wanted if self._first_anchored[n] is not None}
+
+        if self._scanner is not None and unresolved:
+            for pos, root in self._anchor_positions(text):
+                for name, priority, rule in self._by_root[root]:
+                    if name not in wanted or (name, priority) in found:
+                        continue
+                    # A higher-priority rule already matched, this one can't win
+                    if any((name, p) in found for p in range(priority)):
+                        continue
+                    match = rule.regex.match(text, pos)
+                    if match:
+                        found[(name, priority)] = match
+                        if priority == self._first_anchored[name]:
+                            unresolved.discard(name)
+                if not unresolved:
+                    break
+
+        result = {}
+        for name in wanted:
+            result[name] = (None, None)
+            for priority, rule in enumerate(self.fields[name]):
+                match = found.get((name, priority)) if rule.anchors else rule.regex.search(text)
+                if match:
+                    result[name] = (priority, rule.value(match))
+                    break
+        return result
+
+
+class FieldAccumulator:
+    """
+    A FieldExtractor fed one page at a time. Each field keeps the value of
+    the highest-priority rule seen so far (the earliest page on ties), which
+    is what extract() over the joined pages returns unless a match would
+    straddle a page break. Fields settled by their first rule stop being searched.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self._best = {name: (None, None) for name in extractor.fields}
+
+    def feed(self, text):
+        open_names = [n for n, (priority, _) in self._best.items() if priority != 0]
+        if not open_names:
+            return
+        for name, (priority, value) in self.extractor.extract_ranked(text, open_names).items():
+            best = self._best[name][0]
+            if priority is not None and (best is None or priority < best):
+                self._best[name] = (priority, value)
+
+    def result(self):
+        return {name: value for name, (_, value) in self._best.items()}
+
+
+# --- Shared building blocks (the header-field rules themselves live in rules.json) ---
+DATE_RE = r"\d{1,2}[-/]\d{1,2}[-/]\d{2,4}"
+AMOUNT_RE = r"₹?\s*[\d,]+\.\d{2}|\d{1,3}(?:,\d{3})*(?:\.\d{2})?"
+
+
+def _last4_digits(value):
+    s = re.sub(r"[^0-9]", "", value)
+    return s[-4:] if len(s) >= 4 else None
+
+
+# Post-processing a rule can name in the rules file ("clean"); null keeps the raw match
+CLEANERS = {
+    "strip": str.strip,
+    "last4_digits": _last4_digits,
+}
@@ -0,0 +1,114 @@
+# backend/parser_engine/instrumentation.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("stage_timer", default=None)
+# time.time() by which the parse running in this context must finish
+_deadline = ContextVar("parse_deadline", default=None)
+
+
+class ParseTimeout(Exception):
+    """A parse job ran past its deadline."""
+
+
+class StageTimer:
+    """
+    Wall-clock seconds spent in each named stage of one parse, plus a few
+    descriptive labels (bank, page count). Stages may nest, e.g. extract_text
+    time is also part of the enclosing parse stage.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.labels = {}
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def merge(self, other):
+        """Fold in a timer's as_dict() from elsewhere (e.g. a worker process)."""
+        for stage, seconds in other.get("stages", {}).items():
+            self.add(stage, seconds)
+        self.labels.update(other.get("labels", {}))
+
+    def as_dict(self):
+        return {"stages": dict(self.stages), "labels": dict(self.labels)}
+
+
+@contextmanager
+def collect_stages():
+    """Collect stage timings for everything run inside the block."""
+    timer = StageTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Give everything run inside the block `seconds` to finish (None or 0: no
+    limit). A Python thread can't be interrupted, so the deadline is checked
+    as each timed stage starts and ends: a runaway extract_tables on one page
+    still runs to completion, but the parse stops right after it. (Process
+    mode kills a worker stuck in such a stage; see workers.ParseExecutor.)
+    """
+    token = _deadline.set(time.time() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def check_deadline():
+    """Raise ParseTimeout if the parse in this context is past its deadline."""
+    end = _deadline.get()
+    if end is not None and time.time() > end:
+        raise ParseTimeout("Parsing took longer than the deadline allows")
+
+
+@contextmanager
+def timed(stage):
+    """Time the block as `stage` (free when nobody is collecting) and enforce any deadline around it."""
+    check_deadline()
+    timer = _current.get()
+    if timer is None:
+        yield
+    else:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timer.add(stage, time.perf_counter() - start)
+    check_deadline()
+
+
+def timed_iter(stage, iterable):
+    """
+    Yield from `iterable`, timing only the work of producing each item as
+    `stage` (not the consumer's time between items); free when nobody is collecting.
+    """
+    timer = _current.get()
+    if timer is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            timer.add(stage, time.perf_counter() - start)
+            return
+        timer.add(stage, time.perf_counter() - start)
+        yield item
+
+
+def label(name, value):
+    """Attach a label (e.g. bank, pages) to the parse being collected, if any."""
+    timer = _current.get()
+    if timer is not None:
+        timer.labels[name] = value
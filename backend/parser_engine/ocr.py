@@ -0,0 +1,170 @@
+# backend/parser_engine/ocr.py
+import hashlib
+import importlib
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# A content stream that never opens a text object has no text layer
+_TEXT_OBJECT_RE = re.compile(rb"(?:^|\s)BT(?:\s|$)")
+
+
+class TesseractEngine:
+    """Local Tesseract through pytesseract; needs `pip install pytesseract` and the tesseract binary."""
+
+    name = "tesseract"
+
+    def __init__(self, lang="eng", config="--psm 6"):
+        try:
+            import pytesseract
+        except ImportError as e:
+            raise RuntimeError("OCR_ENGINE=tesseract needs pytesseract (pip install pytesseract)") from e
+        self._pytesseract = pytesseract
+        self.lang = lang
+        self.config = config
+
+    def __call__(self, png):
+        from PIL import Image
+
+        return self._pytesseract.image_to_string(Image.open(io.BytesIO(png)), lang=self.lang, config=self.config)
+
+
+OCR_ENGINES = {"tesseract": TesseractEngine}
+
+
+# --- Which pages need OCR ---
+def _stream_bytes(obj):
+    from pdfminer.pdftypes import resolve1
+
+    stream = resolve1(obj)
+    data = stream.get_rawdata()
+    return data if data is not None else stream.get_data()
+
+
+def page_fingerprint(page_obj):
+    """SHA-256 of a pdfminer page's content streams and XObjects: equal for the same scan, whatever the file."""
+    from pdfminer.pdftypes import resolve1
+
+    h = hashlib.sha256()
+    for stream in page_obj.contents:
+        h.update(_stream_bytes(stream))
+    xobjects = resolve1((page_obj.resources or {}).get("XObject")) or {}
+    for name in sorted(xobjects):
+        h.update(_stream_bytes(xobjects[name]))
+    return h.hexdigest()
+
+
+_RENDER_LOCK = threading.Lock()
+
+
+def render_page(pdf_bytes, index, resolution=300):
+    """PNG bytes of one page in grayscale (pdfium renders one page at a time, process-wide)."""
+    import pypdfium2
+
+    with _RENDER_LOCK:
+        document = pypdfium2.PdfDocument(pdf_bytes)
+        try:
+            image = document[index].render(scale=resolution / 72).to_pil()
+        finally:
+            document.close()
+    png = io.BytesIO()
+    image.convert("L").save(png, format="PNG")
+    return png.getvalue()
+
+
+def lacks_text_layer(page_obj):
+    """A page that draws images but never shows text: a scan, worth rasterizing."""
+    from pdfminer.pdftypes import resolve1
+
+    xobjects = resolve1((page_obj.resources or {}).get("XObject")) or {}
+    if not xobjects:
+        return False
+    return not any(_TEXT_OBJECT_RE.search(resolve1(s).get_data()) for s in page_obj.contents)
+
+
+class PageOcr:
+    """
+    OCR for pages without a text layer on a thread pool: each job rasterizes
+    its page (one render at a time, pdfium isn't thread-safe) and runs the
+    engine, so a document's scans are recognized in parallel while the
+    caller carries on with its text pages. Results are cached by page
+    fingerprint, engine and resolution, so the same scanned page costs
+    nothing the second time, in any document.
+    """
+
+    def __init__(self, engine, workers=None, resolution=300, cache_size=256):
+        self.engine = engine
+        self.name = getattr(engine, "name", None) or getattr(engine, "__name__", type(engine).__name__)
+        self.workers = workers or os.cpu_count() or 1
+        self.resolution = resolution
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+        self.pages = 0
+        self.cache_hits = 0
+
+    def submit(self, page_obj, pdf_bytes, index):
+        """Future of the OCR text for page `index` (a pdfminer page) of the PDF in `pdf_bytes`."""
+        key = (self.name, self.resolution, page_fingerprint(page_obj))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                future = Future()
+                future.set_result(self._cache[key])
+                return future
+        return self._pool.submit(self._recognize, key, pdf_bytes, index)
+
+    def _recognize(self, key, pdf_bytes, index):
+        text = self.engine(render_page(pdf_bytes, index, self.resolution)) or ""
+        with self._lock:
+            self.pages += 1
+            self._cache[key] = text
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return text
+
+    def stats(self):
+        with self._lock:
+            return {"engine": self.name, "pages": self.pages, "cache_hits": self.cache_hits,
+                    "cache_entries": len(self._cache), "workers": self.workers}
+
+
+# --- Configuration ---
+_configured = {"ocr": None, "loaded": False}
+_config_lock = threading.Lock()
+
+
+def _load_engine(spec):
+    if spec in OCR_ENGINES:
+        return OCR_ENGINES[spec](lang=os.environ.get("OCR_LANG", "eng"))
+    # 'package.module:name' plugs in any callable taking PNG bytes and returning text
+    module_name, _, attr = spec.partition(":")
+    engine = getattr(importlib.import_module(module_name), attr or "engine")
+    return engine() if isinstance(engine, type) else engine
+
+
+def ocr_from_env():
+    """PageOcr from OCR_* environment variables, or None when OCR_ENGINE is unset."""
+    spec = os.environ.get("OCR_ENGINE", "").strip()
+    if not spec:
+        return None
+    return PageOcr(
+        _load_engine(spec),
+        workers=int(os.environ.get("OCR_WORKERS", 0)) or None,
+        resolution=int(os.environ.get("OCR_DPI", 300)),
+        cache_size=int(os.environ.get("OCR_CACHE_SIZE", 256)),
+    )
+
+
+def get_ocr():
+    """The process-wide PageOcr (built from the environment on first use), or None."""
+    with _config_lock:
+        if not _configured["loaded"]:
+            _configured["ocr"] = ocr_from_env()
+            _configured["loaded"] = True
+        return _configured["ocr"]
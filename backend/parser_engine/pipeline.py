@@ -0,0 +1,131 @@
+# backend/parser_engine/pipeline.py
+import importlib
+import threading
+from collections.abc import Mapping
+
+from .document import open_document
+from .engine import iter_profile_transactions
+from .fields import FieldAccumulator
+from .instrumentation import label, timed, timed_iter
+from .base_parser import (
+    extract_text_from_pdf,
+    extract_header_fields,
+    extract_transactions_from_text,
+    iter_transactions_from_text,
+)
+from .rules import current_rules, detect_bank, pinned_rules
+
+
+# --- Bank parser map ---
+class LazyParsers(Mapping):
+    """
+    Bank -> parse function, each given as "module:function" relative to this
+    package and imported the first time it is looked up, so importing the
+    pipeline doesn't load every parser. `None` marks a bank parsed generically.
+    """
+
+    def __init__(self, specs):
+        self._specs = dict(specs)
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, bank):
+        if bank in self._loaded:
+            return self._loaded[bank]
+        spec = self._specs[bank]
+        with self._lock:
+            if bank not in self._loaded:
+                parser = None
+                if spec:
+                    module_name, _, attr = spec.partition(":")
+                    parser = getattr(importlib.import_module(module_name, __package__), attr)
+                self._loaded[bank] = parser
+        return self._loaded[bank]
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+    def load_all(self):
+        """Import every parser now (warm-up); returns the banks that have one."""
+        return [bank for bank in self if self[bank]]
+
+
+PARSERS = LazyParsers({
+    "HDFC": ".hdfc_parser:parse_hdfc",
+    "ICICI": ".icici_parser:parse_icici",
+    "IDFC": ".idfc_parser:parse_idfc",
+    "CITI": ".citi_parser:parse_citi",
+    "VISA": ".visa_parser:parse_visa",
+    "UNKNOWN": None,
+})
+
+def parse_generic(text):
+    """Best-effort fields for statements from banks we have no parser for."""
+    with timed("parse"), timed("regex"):
+        data = extract_header_fields(text)
+        data["transactions"] = extract_transactions_from_text(text)
+    return data
+
+
+def parse_statement(source, bank_hint=None):
+    """
+    Detect the bank and parse a statement PDF: a path or a seekable binary
+    stream such as the in-memory upload buffer. `bank_hint` is tried first
+    (see detect_bank).
+    Returns (bank, parsed_data).
+    """
+    # Open once: text, layout and tables are shared by detection and the parser.
+    # Pages are extracted lazily, so detection and parsing stop as early as they can.
+    # The rules are pinned too: a reload mid-parse only applies to the next statement.
+    with pinned_rules() as rules, open_document(source) as doc:
+        label("rules", rules.fingerprint)
+        label("pages", doc.page_count)
+        with timed("detect_bank"):
+            bank = detect_bank(doc, rules, bank_hint)
+        label("bank", bank)
+        parser = PARSERS.get(bank)
+        if parser:
+            return bank, parser(doc)
+        return bank, parse_generic(extract_text_from_pdf(doc))
+
+
+# --- Streaming ---
+def iter_statement(source, bank_hint=None):
+    """
+    parse_statement() as a stream of (kind, value) events for very large statements:
+        ("statement", {"bank": ..., "pages": ...})   once the bank is known
+        ("transaction", row)                         as each page is parsed
+        ("fields", {header field: value})            after the last page it needs
+    Pages are released as soon as they are done, so peak memory stays flat
+    however many rows the statement has. Header fields are gathered page by
+    page, which only differs from parse_statement() for a match spanning a page break.
+    """
+    # One RuleSet for the whole stream, whatever reloads happen while it is consumed
+    rules = current_rules()
+    with open_document(source, keep_pages=False) as doc:
+        label("rules", rules.fingerprint)
+        label("pages", doc.page_count)
+        with timed("detect_bank"):
+            bank = detect_bank(doc, rules, bank_hint)
+        label("bank", bank)
+        yield "statement", {"bank": bank, "pages": doc.page_count}
+
+        profile = rules.profiles.get(bank) if PARSERS.get(bank) else None
+        fields = FieldAccumulator(profile.fields if profile else rules.header_fields)
+
+        def feed(_, text):
+            with timed("regex"):
+                fields.feed(text)
+        doc.page_listeners.append(feed)
+
+        if profile:
+            rows = iter_profile_transactions(doc, profile)
+        else:
+            rows = (row for i in doc.iter_pages() for row in iter_transactions_from_text(doc.page_text(i)))
+
+        for row in timed_iter("parse", rows):
+            yield "transaction", row
+        yield "fields", fields.result()
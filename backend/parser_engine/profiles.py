@@ -0,0 +1,93 @@
+# backend/parser_engine/profiles.py
+import re
+import threading
+from collections import OrderedDict
+
+from .document import SECTION_END, SECTION_START
+from .fields import FieldExtractor, compile_pattern
+
+MAX_WORD_LAYOUTS = 16     # learned column layouts kept per profile, one per distinct header row
+
+
+class BankProfile:
+    """
+    Everything the shared parsing engine needs to know about one issuer:
+    detection keywords, compiled header-field rules, where the transaction
+    section sits and how its rows are extracted. Built from the rules file
+    by rules.py, which builds a new one when the bank's rules change.
+    """
+
+    def __init__(self, name, keywords, fields, line_pattern, requires_any=(), transaction_engine="table",
+                 table_settings=None, section=(SECTION_START, SECTION_END)):
+        self.name = name
+        self.keywords = tuple(k.lower() for k in keywords)
+        self.requires_any = tuple(k.lower() for k in requires_any)
+        self.fields = FieldExtractor(fields)
+        self.transaction_engine = transaction_engine
+        self.table_settings = table_settings
+        self.section = section
+        self.line_re = compile_pattern(line_pattern, re.IGNORECASE)
+        # Column boundaries learned by the words engine, by header row geometry, for later statements.
+        # Request and job threads parse concurrently, so the LRU is only touched under its lock
+        self.word_columns = OrderedDict()
+        self._word_columns_lock = threading.Lock()
+
+    def matches(self, found):
+        """Whether the set of keywords `found` in a statement identifies this issuer."""
+        if not any(k in found for k in self.keywords):
+            return False
+        return not self.requires_any or any(k in found for k in self.requires_any)
+
+    def word_layout(self, key):
+        """The column boundaries learned for the header row `key`, or None."""
+        with self._word_columns_lock:
+            columns = self.word_columns.get(key)
+            if columns is not None:
+                self.word_columns.move_to_end(key)
+            return columns
+
+    def learn_word_layout(self, key, columns):
+        """Keep `columns` for the header row `key`, evicting the least recently used layout past MAX_WORD_LAYOUTS."""
+        with self._word_columns_lock:
+            self.word_columns[key] = columns
+            self.word_columns.move_to_end(key)
+            while len(self.word_columns) > MAX_WORD_LAYOUTS:
+                self.word_columns.popitem(last=False)
+
+
+class BankDetector:
+    """
+    Finds every profile keyword in one pass: a single compiled alternation over
+    the lowercased text, with longer keywords sharing their prefix's position.
+    The first profile (in registry order) whose keywords are present wins.
+    """
+
+    def __init__(self, profiles):
+        self.profiles = list(profiles)
+        keywords = {k for p in self.profiles for k in p.keywords + p.requires_any}
+        roots = sorted(k for k in keywords if not any(o != k and k.startswith(o) for o in keywords))
+        self._extensions = {r: sorted(k for k in keywords if k != r and k.startswith(r)) for r in roots}
+        self._scanner = compile_pattern("|".join(re.escape(r) for r in sorted(roots, key=len, reverse=True)))
+
+    def scan(self, text, found=None):
+        """Add every keyword present in `text` to `found` (a set) and return it."""
+        found = set() if found is None else found
+        lowered = text.lower()
+        m = self._scanner.search(lowered)
+        while m:
+            root = m.group()
+            found.add(root)
+            for keyword in self._extensions[root]:
+                if lowered.startswith(keyword, m.start()):
+                    found.add(keyword)
+            if self.profiles and self.profiles[0].matches(found):
+                break
+            # Roots can overlap ('...car|d|ue...'), so resume one character on
+            m = self._scanner.search(lowered, m.start() + 1)
+        return found
+
+    def resolve(self, found):
+        for profile in self.profiles:
+            if profile.matches(found):
+                return profile.name
+        return "UNKNOWN"
@@ -0,0 +1,244 @@
+# backend/parser_engine/records.py
+import csv
+import datetime
+import io
+import re
+from array import array
+from enum import Enum
+from functools import lru_cache
+
+
+class TransactionType(str, Enum):
+    PURCHASE = "purchase"
+    CASH_ADVANCE = "cash_advance"
+    FINANCE_CHARGE = "finance_charge"
+    OTHER = "other"
+    UNKNOWN = "unknown"
+
+
+TYPE_CODES = list(TransactionType)
+_TYPE_INDEX = {t: i for i, t in enumerate(TYPE_CODES)}
+
+_TYPE_NAMES = {
+    "purchase": TransactionType.PURCHASE,
+    "cashadvance": TransactionType.CASH_ADVANCE,
+    "financecharge": TransactionType.FINANCE_CHARGE,
+    # to_dict()/to_columnar() values, so exported rows load back as they were
+    "other": TransactionType.OTHER,
+    "unknown": TransactionType.UNKNOWN,
+}
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+ISO_DATE_RE = re.compile(r"^\s*(\d{4})-(\d{2})-(\d{2})\s*$")
+# '01 Oct 2025', '1 October 2025', '13/03/2024', '1-2-24' (day first, as printed by Indian issuers)
+DATE_PARTS_RE = re.compile(r"^\s*(\d{1,2})[\s\-/]+([A-Za-z]{3,}|\d{1,2})[\s\-/,]+(\d{2}|\d{4})\s*$")
+AMOUNT_PARTS_RE = re.compile(r"(\d[\d,]*)(?:\.(\d+))?")
+
+# Missing amounts in the paise column (arrays can't hold None)
+NULL_PAISE = -(2 ** 63)
+
+
+# --- Parsing the parsers' strings ---
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """datetime.date for a statement (or ISO) date string, or None when it can't be read."""
+    m = DATE_PARTS_RE.match(text or "")
+    if m:
+        day, month, year = m.groups()
+    else:
+        m = ISO_DATE_RE.match(text or "")
+        if not m:
+            return None
+        year, month, day = m.groups()
+    month = MONTHS.get(month[:3].lower()) if month.isalpha() else int(month)
+    year = int(year) + (2000 if len(year) == 2 else 0)
+    try:
+        return datetime.date(year, month, int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_amount(text):
+    """
+    Integer paise for an amount string ('₹ 1,234.50', '1234.5', '1,000'),
+    negative for credits marked 'CR' or '-'; None when there is no number, or
+    when it has more than 2 decimals ('12.345', or '1.234' written with a thousands dot).
+    """
+    if not text:
+        return None
+    m = AMOUNT_PARTS_RE.search(text)
+    if not m:
+        return None
+    whole, fraction = m.groups()
+    if fraction and len(fraction) > 2:
+        return None
+    paise = int(whole.replace(",", "")) * 100 + int((fraction or "0").ljust(2, "0"))
+    if "cr" in text.lower() or text.lstrip().startswith("-"):
+        paise = -paise
+    return paise
+
+
+@lru_cache(maxsize=256)
+def parse_type(text):
+    """The TransactionType for a type cell; a cached lookup, so equal strings share one member."""
+    if not text:
+        return TransactionType.UNKNOWN
+    return _TYPE_NAMES.get(re.sub(r"[^a-z]", "", text.lower()), TransactionType.OTHER)
+
+
+class Transaction:
+    """One normalized transaction: a date, integer paise and a TransactionType instead of four strings."""
+
+    __slots__ = ("date", "description", "amount_paise", "type")
+
+    def __init__(self, date, description, amount_paise, type=TransactionType.UNKNOWN):
+        self.date = date
+        self.description = description
+        self.amount_paise = amount_paise
+        self.type = type
+
+    @classmethod
+    def from_row(cls, row):
+        """Normalize a parser row dict ({date, description, amount[, type]}) or a to_dict() one."""
+        amount = row["amount_paise"] if "amount_paise" in row else parse_amount(row.get("amount"))
+        return cls(
+            parse_date(row.get("date")),
+            row.get("description") or "",
+            amount,
+            parse_type(row.get("type")),
+        )
+
+    def to_dict(self):
+        return {
+            "date": self.date.isoformat() if self.date else None,
+            "description": self.description,
+            "amount_paise": self.amount_paise,
+            "type": self.type.value,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Transaction) and all(
+            getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        return (f"Transaction({self.date!r}, {self.description!r}, "
+                f"{self.amount_paise!r}, {self.type.value})")
+
+
+class TransactionColumns:
+    """
+    Transactions stored column-wise: dates as day ordinals and amounts as
+    paise in typed arrays, types as one byte each, descriptions interned.
+    About 25 bytes a row plus the description, against several hundred
+    for a dict of four strings, and every export reads straight off the columns.
+    """
+
+    __slots__ = ("dates", "descriptions", "amounts", "types")
+
+    def __init__(self):
+        self.dates = array("q")       # date.toordinal(), 0 when unknown
+        self.descriptions = []
+        self.amounts = array("q")     # paise, NULL_PAISE when unknown
+        self.types = bytearray()      # index into TYPE_CODES
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Columns for an iterable of parser row dicts (or Transactions)."""
+        columns = cls()
+        for row in rows:
+            columns.append(row if isinstance(row, Transaction) else Transaction.from_row(row))
+        return columns
+
+    @classmethod
+    def from_columnar(cls, data):
+        """Columns back from a to_columnar() dict."""
+        keys = ("date", "description", "amount_paise", "type")
+        values = [data.get(k) or [] for k in keys]
+        return cls.from_rows(dict(zip(keys, row)) for row in zip(*values))
+
+    def append(self, tx):
+        self.dates.append(tx.date.toordinal() if tx.date else 0)
+        self.descriptions.append(_intern(tx.description))
+        self.amounts.append(NULL_PAISE if tx.amount_paise is None else tx.amount_paise)
+        self.types.append(_TYPE_INDEX[tx.type])
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, i):
+        ordinal, paise = self.dates[i], self.amounts[i]
+        return Transaction(
+            datetime.date.fromordinal(ordinal) if ordinal else None,
+            self.descriptions[i],
+            None if paise == NULL_PAISE else paise,
+            TYPE_CODES[self.types[i]],
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    # --- Export ---
+    def to_columnar(self):
+        """{column: [values]}: JSON-ready, one list per field instead of one object per row."""
+        return {
+            "date": [datetime.date.fromordinal(d).isoformat() if d else None for d in self.dates],
+            "description": list(self.descriptions),
+            "amount_paise": [None if a == NULL_PAISE else a for a in self.amounts],
+            "type": [TYPE_CODES[t].value for t in self.types],
+        }
+
+    def to_csv(self):
+        out = io.StringIO()
+        columns = self.to_columnar()
+        writer = csv.writer(out)
+        writer.writerow(list(columns))
+        writer.writerows(zip(*columns.values()))
+        return out.getvalue()
+
+    def to_arrow(self):
+        """A pyarrow.Table (date32, string, int64 paise, dictionary-encoded type)."""
+        pa = _pyarrow()
+        return pa.table({
+            "date": pa.array([datetime.date.fromordinal(d) if d else None for d in self.dates], type=pa.date32()),
+            "description": pa.array(self.descriptions, type=pa.string()),
+            "amount_paise": pa.array([None if a == NULL_PAISE else a for a in self.amounts], type=pa.int64()),
+            "type": pa.array([TYPE_CODES[t].value for t in self.types], type=pa.string()).dictionary_encode(),
+        })
+
+    def to_arrow_ipc(self):
+        """The Arrow table as IPC stream bytes."""
+        pa = _pyarrow()
+        table = self.to_arrow()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def to_parquet(self):
+        """The Arrow table as Parquet file bytes."""
+        _pyarrow()
+        import pyarrow.parquet as pq
+
+        sink = io.BytesIO()
+        pq.write_table(self.to_arrow(), sink)
+        return sink.getvalue()
+
+
+_interned = {}
+
+
+def _intern(text):
+    # Merchants repeat a lot within and across statements; keep one copy of each (bounded)
+    if len(_interned) > 65536:
+        _interned.clear()
+    return _interned.setdefault(text, text)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError("Arrow/Parquet export needs pyarrow (pip install pyarrow)") from e
+    return pyarrow
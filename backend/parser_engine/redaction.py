@@ -0,0 +1,95 @@
+# backend/parser_engine/redaction.py
+import os
+import re
+import threading
+
+# One alternative per kind of identifier, tried together in a single scan
+PII_PATTERNS = {
+    # Card numbers as printed: 13-19 digits unbroken, in groups of 4 (4-4-4-4, 4-4-4-4-3) or Amex's 4-6-5,
+    # separated by spaces or hyphens, and not running into an amount ('... 1111 987.12'). Only Luhn-valid ones are masked
+    "pan": (r"(?<!\d)(?:\d{13,19}|\d{4}(?P<sep>[ -])\d{4}(?P=sep)\d{4}(?P=sep)\d{4}(?:(?P=sep)\d{3})?"
+            r"|\d{4}(?P<amex_sep>[ -])\d{6}(?P=amex_sep)\d{5})(?![\d.,]?\d)"),
+    "email": r"(?<![\w.%+-])[\w.%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}",
+    # Indian mobile numbers (+91 / 0 prefix optional) and other '+'-prefixed international numbers
+    "phone": r"(?<![\w+])(?:(?:\+91[ -]?|0)?[6-9]\d{4}[ -]?\d{5}|\+\d{1,3}(?:[ -]?\d){7,12})(?!\d)",
+}
+DIGIT_RE = re.compile(r"\d")
+
+
+def luhn_valid(digits):
+    """Whether a string of digits passes the Luhn checksum every card number carries."""
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        n = ord(d) - 48
+        if i % 2:
+            n = n * 2 - 9 if n > 4 else n * 2
+        total += n
+    return total % 10 == 0
+
+
+def _mask_digits(value, keep):
+    """`value` with every digit but the last `keep` replaced by X; separators stay where they are."""
+    masked = sum(c.isdigit() for c in value) - keep
+    out = []
+    for c in value:
+        if masked > 0 and c.isdigit():
+            c = "X"
+            masked -= 1
+        out.append(c)
+    return "".join(out)
+
+
+def _mask(m):
+    kind, value = m.lastgroup, m.group()
+    if kind == "pan":
+        if not luhn_valid("".join(DIGIT_RE.findall(value))):
+            return value
+        return _mask_digits(value, 4)
+    if kind == "phone":
+        return _mask_digits(value, 2)
+    local, _, domain = value.partition("@")
+    return f"{local[0]}***@{domain}"
+
+
+class Redactor:
+    """
+    Masks card numbers, email addresses and phone numbers in statement text
+    with one compiled pass per string: card numbers keep their last 4 digits
+    (as printed on statements, so last_4_digits still works), phone numbers
+    their last 2, and email addresses the first character and the domain.
+    Digit runs that fail the Luhn check are left alone, so reference and
+    account numbers of card-number length survive.
+    """
+
+    def __init__(self, kinds=tuple(PII_PATTERNS)):
+        unknown = set(kinds) - set(PII_PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown redaction kind(s): {', '.join(sorted(unknown))}")
+        self.kinds = tuple(k for k in PII_PATTERNS if k in kinds)
+        self._regex = re.compile("|".join(f"(?P<{k}>{PII_PATTERNS[k]})" for k in self.kinds))
+
+    def redact(self, text):
+        """`text` with every identifier masked."""
+        return self._regex.sub(_mask, text) if text else text
+
+
+# --- Configuration ---
+_configured = {"redactor": None, "loaded": False}
+_config_lock = threading.Lock()
+
+
+def redactor_from_env():
+    """Redactor for the kinds listed in REDACT_PII (default: all of them), or None when it is 0."""
+    spec = os.environ.get("REDACT_PII", "pan,email,phone").strip().lower()
+    if spec in ("", "0", "false", "no", "off"):
+        return None
+    return Redactor([k.strip() for k in spec.split(",") if k.strip()])
+
+
+def get_redactor():
+    """The process-wide Redactor (built from the environment on first use), or None."""
+    with _config_lock:
+        if not _configured["loaded"]:
+            _configured["redactor"] = redactor_from_env()
+            _configured["loaded"] = True
+        return _configured["redactor"]
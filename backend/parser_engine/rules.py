@@ -0,0 +1,249 @@
+# backend/parser_engine/rules.py
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from .engine import TRANSACTION_ENGINES
+from .fields import CLEANERS, FieldExtractor, FieldRule
+from .profiles import BankDetector, BankProfile
+
+# Bank profiles, header-field regexes, section markers and table settings
+RULES_FILE = Path(__file__).resolve().parent / "rules.json"
+
+
+class RuleError(ValueError):
+    """A rules file that can't be used: bad JSON, a missing or unknown name, or a regex that doesn't compile."""
+
+
+# --- Compilation ---
+def _field_rule(spec):
+    clean = spec.get("clean", "strip")
+    if clean is not None and clean not in CLEANERS:
+        raise RuleError(f"unknown clean {clean!r} (one of: {', '.join(CLEANERS)})")
+    return FieldRule(
+        spec["pattern"],
+        anchors=spec.get("anchors", ()),
+        group=spec.get("group", 1),
+        flags=re.IGNORECASE if spec.get("ignore_case", True) else 0,
+        clean=CLEANERS[clean] if clean else None,
+    )
+
+
+def _resolve_fields(config, set_name):
+    """{field: [rule specs]} for a named field set, references replaced by the rules they name."""
+    return {field: config["field_rules"][rules] for field, rules in config["field_sets"][set_name].items()}
+
+
+def _resolve_bank(config, bank):
+    """Everything one bank's profile is built from, with every reference and default filled in."""
+    section = bank.get("section") or config["section"]
+    engine = bank.get("transaction_engine", "table")
+    if engine not in TRANSACTION_ENGINES:
+        raise RuleError(f"unknown transaction_engine {engine!r}")
+    return {
+        "keywords": bank["keywords"],
+        "requires_any": bank.get("requires_any", []),
+        "fields": _resolve_fields(config, bank["fields"]),
+        "transaction_engine": engine,
+        "table_settings": config["table_settings"][bank.get("table_settings", "ruled")],
+        "section": [section["start"], section["end"]],
+        "transaction_line": bank.get("transaction_line") or config["transaction_line"],
+    }
+
+
+def _build_profile(name, spec):
+    return BankProfile(
+        name,
+        spec["keywords"],
+        {field: [_field_rule(r) for r in rules] for field, rules in spec["fields"].items()},
+        spec["transaction_line"],
+        requires_any=spec["requires_any"],
+        transaction_engine=spec["transaction_engine"],
+        table_settings=dict(spec["table_settings"]),
+        section=tuple(spec["section"]),
+    )
+
+
+class RuleSet:
+    """
+    One version of the rules file, compiled: the bank profiles in detection
+    order, their keyword detector and the generic header fields. A RuleSet
+    never changes once built, so a parse can hold on to the one it started
+    with. Profiles whose rules are unchanged since `previous` are carried
+    over as they are, with the column layouts the words engine has learned.
+    """
+
+    def __init__(self, data, previous=None):
+        self.fingerprint = hashlib.sha256(data).hexdigest()[:12]
+        try:
+            config = json.loads(data)
+            self.version = config["version"]
+            self._specs = {bank["name"]: _resolve_bank(config, bank) for bank in config["banks"]}
+            old = previous._specs if previous else {}
+            self.profiles = {
+                name: previous.profiles[name] if old.get(name) == spec else _build_profile(name, spec)
+                for name, spec in self._specs.items()
+            }
+            generic = _resolve_fields(config, config["generic_fields"])
+            if previous and previous._generic == generic:
+                self.header_fields = previous.header_fields
+            else:
+                self.header_fields = FieldExtractor(
+                    {field: [_field_rule(r) for r in rules] for field, rules in generic.items()})
+            self._generic = generic
+        except json.JSONDecodeError as e:
+            raise RuleError(f"invalid JSON: {e}") from e
+        except KeyError as e:
+            raise RuleError(f"missing or unknown name {e}") from e
+        except (TypeError, AttributeError) as e:
+            raise RuleError(f"malformed rules: {e}") from e
+        except re.error as e:
+            raise RuleError(f"bad pattern {e.pattern!r}: {e}") from e
+        self.detector = BankDetector(self.profiles.values())
+
+
+# --- Hot reload ---
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class RuleStore:
+    """
+    The rules file, compiled, and recompiled when it changes on disk. At most
+    every `check_interval` seconds get() looks at the file's mtime; a changed
+    file is compiled on the side and swapped in with a single assignment, so
+    parses already running finish with the rules they started with. A file
+    that fails to load is reported and the last good rules stay in use.
+    check_interval=0 loads the file once and never looks again.
+    """
+
+    def __init__(self, path=RULES_FILE, check_interval=2.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.errors = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stamp = _file_stamp(self.path)
+        self._rules = RuleSet(self.path.read_bytes())
+        self._checked = time.monotonic()
+
+    def get(self):
+        """The latest good RuleSet."""
+        if self.check_interval and time.monotonic() - self._checked >= self.check_interval:
+            self.reload()
+        return self._rules
+
+    def reload(self, force=False):
+        """Recompile if the file changed since the last look (or `force`); returns the RuleSet in use."""
+        with self._lock:
+            self._checked = time.monotonic()
+            stamp = _file_stamp(self.path)
+            if stamp == self._stamp and not force:
+                return self._rules
+            self._stamp = stamp
+            try:
+                rules = RuleSet(self.path.read_bytes(), previous=self._rules)
+            except (OSError, RuleError) as e:
+                self.errors += 1
+                self.last_error = str(e)
+                print(f"⚠️ Parser rules not reloaded, still on version {self._rules.version}: {e}")
+                return self._rules
+            self._rules = rules
+            self.reloads += 1
+            self.last_error = None
+        print(f"🔁 Parser rules reloaded: version {rules.version} ({rules.fingerprint})")
+        return rules
+
+    def stats(self):
+        rules = self._rules
+        return {
+            "version": rules.version,
+            "fingerprint": rules.fingerprint,
+            "banks": len(rules.profiles),
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+def rules_store_from_env():
+    """Build the RuleStore from PARSER_RULES* environment variables."""
+    return RuleStore(
+        path=os.environ.get("PARSER_RULES") or RULES_FILE,
+        check_interval=float(os.environ.get("PARSER_RULES_RELOAD", 2)),
+    )
+
+
+_store = None
+_store_lock = threading.Lock()
+# The RuleSet a parse pinned at its start (see pinned_rules)
+_pinned = contextvars.ContextVar("parser_rules", default=None)
+
+
+def rules_store():
+    """This process's RuleStore, loaded on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = rules_store_from_env()
+    return _store
+
+
+def current_rules():
+    """The RuleSet pinned by the parse running in this context, else the latest one."""
+    return _pinned.get() or rules_store().get()
+
+
+@contextlib.contextmanager
+def pinned_rules():
+    """Keep one RuleSet for everything inside the block, however often the file changes meanwhile."""
+    rules = current_rules()
+    token = _pinned.set(rules)
+    try:
+        yield rules
+    finally:
+        _pinned.reset(token)
+
+
+# --- Lookups ---
+def get_profile(name):
+    return current_rules().profiles[name]
+
+
+def identify_bank(text, rules=None):
+    """Bank name for a statement's text, or UNKNOWN."""
+    detector = (rules or current_rules()).detector
+    return detector.resolve(detector.scan(text))
+
+
+def detect_bank(doc, rules=None, hint=None):
+    """
+    identify_bank over as few pages as possible: pages are scanned in order,
+    each exactly once, and detection stops at the first page that settles the bank.
+    `hint` (the triage's guess) is the first bank tried: once the keywords
+    found so far match it, it wins without walking the rest of the registry.
+    """
+    rules = rules or current_rules()
+    detector = rules.detector
+    hinted = rules.profiles.get(hint)
+    found = set()
+    for _, page_text in doc.iter_page_texts():
+        detector.scan(page_text, found)
+        if hinted is not None and hinted.matches(found):
+            return hint
+        bank = detector.resolve(found)
+        if bank != "UNKNOWN":
+            return bank
+    return "UNKNOWN"
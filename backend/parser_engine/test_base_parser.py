@@ -0,0 +1,42 @@
+# backend/parser_engine/test_base_parser.py
+import random
+import re
+
+import pytest
+
+from backend.parser_engine.base_parser import extract_transactions_from_text
+from backend.parser_engine.fields import AMOUNT_RE, DATE_RE
+
+# The per-line search the single MULTILINE scan replaced
+LINE_RE = re.compile(r"^\s*(" + DATE_RE + r")\s+(.+?)\s+(" + AMOUNT_RE + r")\s*$")
+# Every character str.splitlines() breaks at, plus spaces it doesn't
+SEPARATORS = ["\n", "\r", "\r\n", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029",
+              " ", "  ", "\t", "\x1f", "\xa0", "\u3000"]
+TOKENS = ["12/03/2025", "1-1-25", "1,234.56", "₹ 99.00", "₹2,500.00", "45", "Amazon", "Swiggy Order", "CR", "-"]
+
+
+def per_line(text):
+    return [{"date": m.group(1), "description": m.group(2).strip(), "amount": m.group(3).strip()}
+            for m in map(LINE_RE.search, text.splitlines()) if m]
+
+
+def test_rows():
+    text = "Statement\n12/03/2025  Amazon India  1,234.56\n13/03/2025 Swiggy Order ₹ 99.00\nTotal 1,333.56"
+    assert extract_transactions_from_text(text) == [
+        {"date": "12/03/2025", "description": "Amazon India", "amount": "1,234.56"},
+        {"date": "13/03/2025", "description": "Swiggy Order", "amount": "₹ 99.00"},
+    ]
+    assert len(extract_transactions_from_text(text, max_rows=1)) == 1
+
+
+@pytest.mark.parametrize("separator", SEPARATORS)
+def test_line_breaks_match_splitlines(separator):
+    text = separator.join(["12/03/2025 Amazon 45", "1-1-25 Swiggy Order ₹2,500.00", "x"])
+    assert extract_transactions_from_text(text) == per_line(text)
+
+
+def test_fuzzed_lines_match_splitlines():
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = "".join(rng.choice(TOKENS) + rng.choice(SEPARATORS) for _ in range(rng.randint(2, 14)))
+        assert extract_transactions_from_text(text) == per_line(text), repr(text)
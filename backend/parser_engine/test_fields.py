@@ -0,0 +1,134 @@
+# backend/parser_engine/test_fields.py
+import itertools
+import random
+import re
+
+import pytest
+
+from backend.parser_engine.base_parser import extract_header_fields
+from backend.parser_engine.fields import AMOUNT_RE, DATE_RE, FieldAccumulator, FieldExtractor, FieldRule
+from backend.parser_engine.rules import current_rules
+
+
+# --- The per-field finders FieldExtractor replaced, one re.search per pattern ---
+def old_last4(text):
+    m = re.search(r"card\s*(?:no|number|ending)[:\s]*([0-9Xx\-\s]{4,})", text, re.IGNORECASE)
+    if m:
+        s = re.sub(r"[^0-9]", "", m.group(1))
+        return s[-4:] if len(s) >= 4 else None
+    m2 = re.search(r"([0-9]{4})\b(?!\d)", text)
+    return m2.group(1) if m2 else None
+
+
+def old_total_balance(text):
+    keys = [
+        r"total\s*(?:amount\s*)?due[:\s]*(" + AMOUNT_RE + ")",
+        r"total\s*outstanding\s*[:\s]*(" + AMOUNT_RE + ")",
+        r"new\s*balance[:\s]*(" + AMOUNT_RE + ")",
+        r"total\s*due[:\s]*(" + AMOUNT_RE + ")",
+    ]
+    for k in keys:
+        m = re.search(k, text, re.IGNORECASE)
+        if m:
+            return m.group(1).strip()
+    return None
+
+
+def old_payment_due_date(text):
+    m = re.search(r"(?:payment\s*due\s*date|due\s*date)[:\s]*(" + DATE_RE + ")", text, re.IGNORECASE)
+    if m:
+        return m.group(1)
+    m2 = re.search(r"(?:payment\s*due\s*date|due\s*date)[:\s]*([A-Za-z]{3,}\s+\d{1,2},?\s*\d{4})",
+                   text, re.IGNORECASE)
+    return m2.group(1) if m2 else None
+
+
+def old_billing_cycle(text):
+    m = re.search(r"(statement\s*period|billing\s*cycle)[:\s]*([A-Za-z0-9,\-\s\/]+to\s+[A-Za-z0-9,\-\s\/]+)",
+                  text, re.IGNORECASE)
+    if m:
+        return m.group(2).strip()
+    m2 = re.search(r"statement\s*date[:\s]*(" + DATE_RE + ")", text, re.IGNORECASE)
+    return m2.group(1) if m2 else None
+
+
+def old_header_fields(text):
+    return {
+        "last_4_digits": old_last4(text),
+        "total_balance": old_total_balance(text),
+        "payment_due_date": old_payment_due_date(text),
+        "billing_cycle": old_billing_cycle(text),
+    }
+
+
+HEADER_LINES = [
+    "Card Number: XXXX XXXX XXXX 1234",
+    "CARD ENDING 9876",
+    "card no 12",
+    "Total Amount Due: ₹ 12,345.67",
+    "TOTAL DUE 1,000",
+    "Total Outstanding : 5,432.10",
+    "New Balance: 999.99",
+    "Payment Due Date: 15/04/2024",
+    "Due Date : April 5, 2024",
+    "Statement Period : 24 Sep 2025 to 23 Oct 2025",
+    "Billing Cycle: 01/03/2024 to 31/03/2024",
+    "Statement Date: 31-03-2024",
+    "05/03/2024 Swiggy Order 250.00",
+    "Reward points 2024",
+    "Minimum due 200.00",
+    "İstanbul Kart payment",
+]
+
+
+@pytest.mark.parametrize("lines", [HEADER_LINES, HEADER_LINES[::-1], HEADER_LINES[2:9], HEADER_LINES[9:], []])
+def test_header_fields_match_old_finders(lines):
+    text = "\n".join(lines)
+    assert extract_header_fields(text) == old_header_fields(text)
+
+
+def test_header_fields_match_old_finders_fuzzed():
+    rng = random.Random(0)
+    for _ in range(500):
+        text = "\n".join(rng.sample(HEADER_LINES, rng.randint(1, len(HEADER_LINES))))
+        assert extract_header_fields(text) == old_header_fields(text), text
+
+
+def sequential(extractor, text):
+    """What FieldExtractor promises: each field's first rule that re.search()es, in priority order."""
+    result = {}
+    for name, rules in extractor.fields.items():
+        result[name] = None
+        for rule in rules:
+            match = rule.regex.search(text)
+            if match:
+                result[name] = rule.value(match)
+                break
+    return result
+
+
+def test_bank_profiles_match_sequential_search():
+    profiles = current_rules().profiles.values()
+    for profile, (a, b) in itertools.product(profiles, itertools.combinations(HEADER_LINES, 2)):
+        text = f"{a}\n{b}\n" + "\n".join(HEADER_LINES)
+        assert profile.fields.extract(text) == sequential(profile.fields, text), (profile.name, text)
+
+
+def test_priority_beats_position():
+    extractor = FieldExtractor({"total": [
+        FieldRule(r"total\s*due[:\s]*(\d+)", anchors=["total"]),
+        FieldRule(r"balance[:\s]*(\d+)", anchors=["balance"]),
+    ]})
+    assert extractor.extract("Balance: 5\nTotal due: 7") == {"total": "7"}
+    assert extractor.extract("Balance: 5") == {"total": "5"}
+    assert extractor.extract("nothing here") == {"total": None}
+    assert extractor.extract("Total due: 7", names=["other"]) == {}
+
+
+def test_accumulator_matches_joined_pages():
+    pages = ["Statement Date: 31-03-2024\nCard Number: XXXX 1234", "Total Amount Due: 1,000.00",
+             "Payment Due Date: 15/04/2024"]
+    accumulator = FieldAccumulator(current_rules().header_fields)
+    for page in pages:
+        accumulator.feed(page)
+    assert accumulator.result() == extract_header_fields("\n".join(pages))
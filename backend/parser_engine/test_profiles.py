@@ -0,0 +1,48 @@
+# backend/parser_engine/test_profiles.py
+import threading
+
+from backend.parser_engine.profiles import MAX_WORD_LAYOUTS, BankProfile
+
+
+def profile():
+    return BankProfile("TEST", ["test bank"], {}, r"(\S+) (.+) (\S+) (\S+)")
+
+
+def test_matches():
+    p = BankProfile("TEST", ["test bank"], {}, r"x", requires_any=["card"])
+    assert p.matches({"test bank", "card"})
+    assert not p.matches({"test bank"})
+    assert not p.matches({"card"})
+
+
+def test_word_layouts_are_a_bounded_lru():
+    p = profile()
+    for i in range(MAX_WORD_LAYOUTS):
+        p.learn_word_layout(i, [i])
+    assert p.word_layout(0) == [0]  # now the most recently used
+    p.learn_word_layout("new", [1, 2])
+    assert len(p.word_columns) == MAX_WORD_LAYOUTS
+    assert p.word_layout(1) is None
+    assert p.word_layout(0) == [0] and p.word_layout("new") == [1, 2]
+
+
+def test_word_layouts_across_threads():
+    p = profile()
+    errors = []
+
+    def parse(worker):
+        try:
+            for i in range(2000):
+                key = (worker * 7 + i) % (MAX_WORD_LAYOUTS * 3)
+                if p.word_layout(key) is None:
+                    p.learn_word_layout(key, [key])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=parse, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(p.word_columns) == MAX_WORD_LAYOUTS
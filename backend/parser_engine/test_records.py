@@ -0,0 +1,73 @@
+# backend/parser_engine/test_records.py
+import datetime
+
+import pytest
+
+from backend.parser_engine.records import (
+    Transaction, TransactionColumns, TransactionType, parse_amount, parse_date, parse_type,
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("01 Oct 2025", datetime.date(2025, 10, 1)),
+    ("1 October 2025", datetime.date(2025, 10, 1)),
+    ("13/03/2024", datetime.date(2024, 3, 13)),
+    ("1-2-24", datetime.date(2024, 2, 1)),
+    (" 2024-03-05 ", datetime.date(2024, 3, 5)),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "31/02/2024", "05/13/2024", "Oct 1 2025", "2024-3-5", "1 Foo 2024"])
+def test_parse_date_unreadable(text):
+    assert parse_date(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("₹ 1,234.50", 123450),
+    ("1234.5", 123450),
+    ("1,000", 100000),
+    ("0.05", 5),
+    ("Rs. 12", 1200),
+    ("250.00 CR", -25000),
+    ("250.00 Cr", -25000),
+    ("-99.10", -9910),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "abc", "₹"])
+def test_parse_amount_without_a_number(text):
+    assert parse_amount(text) is None
+
+
+@pytest.mark.parametrize("text", ["12.345", "1.234", "₹ 1,234.500", "0.001 CR"])
+def test_parse_amount_rejects_more_than_2_decimals(text):
+    assert parse_amount(text) is None
+
+
+def test_parse_type():
+    assert parse_type("Purchase") is TransactionType.PURCHASE
+    assert parse_type("Cash Advance") is TransactionType.CASH_ADVANCE
+    assert parse_type("finance-charge") is TransactionType.FINANCE_CHARGE
+    assert parse_type("Refund") is TransactionType.OTHER
+    assert parse_type(None) is TransactionType.UNKNOWN
+    assert parse_type("unknown") is TransactionType.UNKNOWN
+    assert parse_type("other") is TransactionType.OTHER
+
+
+def test_columns_round_trip():
+    rows = [
+        {"date": "05/03/2024", "description": "Swiggy Order", "amount": "250.00", "type": "Purchase"},
+        {"date": None, "description": None, "amount": None, "type": "Refund"},
+        {"date": "06/03/2024", "description": "Uber", "amount": "310.00"},
+    ]
+    columns = TransactionColumns.from_rows(rows)
+    assert len(columns) == 3
+    assert columns[0] == Transaction(datetime.date(2024, 3, 5), "Swiggy Order", 25000, TransactionType.PURCHASE)
+    assert columns[1] == Transaction(None, "", None, TransactionType.OTHER)
+    assert columns[2].type is TransactionType.UNKNOWN
+    assert list(TransactionColumns.from_columnar(columns.to_columnar())) == list(columns)
+    assert [Transaction.from_row(tx.to_dict()) for tx in columns] == list(columns)
@@ -0,0 +1,78 @@
+# backend/parser_engine/test_redaction.py
+import pytest
+
+from backend.parser_engine.redaction import Redactor, luhn_valid, redactor_from_env
+
+
+@pytest.mark.parametrize("digits, valid", [
+    ("4111111111111111", True),
+    ("378282246310005", True),
+    ("5555555555554444", True),
+    ("4111111111111112", False),
+    ("1234567812345678", False),
+])
+def test_luhn(digits, valid):
+    assert luhn_valid(digits) is valid
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Card 4111 1111 1111 1111 used", "Card XXXX XXXX XXXX 1111 used"),
+    ("4111-1111-1111-1111", "XXXX-XXXX-XXXX-1111"),
+    ("4111111111111111", "XXXXXXXXXXXX1111"),
+    ("Amex 3782 822463 10005", "Amex XXXX XXXXXX X0005"),
+    # The amount after the card number is not part of it
+    ("Paid 4111 1111 1111 1111 987.12", "Paid XXXX XXXX XXXX 1111 987.12"),
+])
+def test_card_numbers_keep_last_4(text, expected):
+    assert Redactor().redact(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Ref 4111 1111 1111 1112",  # fails the Luhn check
+    "4111 1111-1111 1111",  # mixed separators
+    "Total 1,234.50 on 12/03/2024",
+])
+def test_non_card_numbers_are_left_alone(text):
+    assert Redactor().redact(text) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Call +91 98765 43210", "Call +XX XXXXX XXX10"),
+    ("Call 09876543210", "Call XXXXXXXXX10"),
+    ("Ph 9876543210.", "Ph XXXXXXXX10."),
+    ("intl +44 20 7946 0958", "intl +XX XX XXXX XX58"),
+])
+def test_phone_numbers_keep_last_2(text, expected):
+    assert Redactor().redact(text) == expected
+
+
+def test_phone_needs_an_indian_mobile_prefix():
+    assert Redactor().redact("Order 1234567890") == "Order 1234567890"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Mail jane.doe@example.com now", "Mail j***@example.com now"),
+    ("PayPal *jane+shop@mail.example.co.in", "PayPal *j***@mail.example.co.in"),
+])
+def test_emails_keep_first_character_and_domain(text, expected):
+    assert Redactor().redact(text) == expected
+
+
+def test_kinds_are_selectable():
+    assert Redactor(["email"]).redact("4111111111111111 a@b.co") == "4111111111111111 a***@b.co"
+    with pytest.raises(ValueError, match="ssn"):
+        Redactor(["ssn"])
+
+
+def test_empty_text():
+    assert Redactor().redact("") == ""
+    assert Redactor().redact(None) is None
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("REDACT_PII", "off")
+    assert redactor_from_env() is None
+    monkeypatch.setenv("REDACT_PII", "pan, phone")
+    assert redactor_from_env().kinds == ("pan", "phone")
+    monkeypatch.delenv("REDACT_PII")
+    assert redactor_from_env().kinds == ("pan", "email", "phone")
@@ -0,0 +1,137 @@
+# backend/profiling.py
+import cProfile
+import json
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class Capture:
+    """Details about one profiled parse, filled in by the caller while it runs."""
+
+    def __init__(self):
+        self.info = {}
+
+    def describe(self, **info):
+        self.info.update(info)
+
+
+class Profiler:
+    """
+    Sampling profiler for slow uploads. A sampled parse runs under cProfile
+    and tracemalloc; if it goes over the latency or memory threshold, the
+    cProfile dump and a JSON summary (bank, pages, timings, top allocations)
+    are written to `directory`, which keeps at most `max_files` captures.
+    Only one parse is profiled at a time, others simply aren't sampled.
+    """
+
+    def __init__(self, directory="profiles", sample_rate=0.0, latency_ms=5000, memory_mb=200,
+                 max_files=50, top_allocations=25):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.latency_ms = latency_ms
+        self.memory_mb = memory_mb
+        self.max_files = max_files
+        self.top_allocations = top_allocations
+        self._busy = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def should_sample(self):
+        return self.enabled and random.random() < self.sample_rate
+
+    @contextmanager
+    def capture(self):
+        """Profile the block if nothing else is being profiled; yields a Capture either way."""
+        capture = Capture()
+        if not self._busy.acquire(blocking=False):
+            yield capture
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield capture
+        finally:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            try:
+                if elapsed_ms >= self.latency_ms or peak_mb >= self.memory_mb:
+                    snapshot = tracemalloc.take_snapshot()
+                    self._save(profile, snapshot, capture.info, elapsed_ms, peak_mb)
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+                self._busy.release()
+
+    # --- Storage ---
+    def _save(self, profile, snapshot, info, elapsed_ms, peak_mb):
+        os.makedirs(self.directory, exist_ok=True)
+        bank = re.sub(r"[^A-Za-z0-9]+", "", str(info.get("bank", "unknown"))) or "unknown"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{bank}"
+        profile.dump_stats(os.path.join(self.directory, name + ".prof"))
+
+        allocations = [
+            {"location": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.top_allocations]
+        ]
+        summary = {
+            "name": name,
+            "captured_at": time.time(),
+            "elapsed_ms": round(elapsed_ms, 1),
+            "peak_memory_mb": round(peak_mb, 2),
+            "latency_threshold_ms": self.latency_ms,
+            "memory_threshold_mb": self.memory_mb,
+            **info,
+            "top_allocations": allocations,
+        }
+        with open(os.path.join(self.directory, name + ".json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"🔬 Saved profile {name} ({elapsed_ms:.0f} ms, {peak_mb:.1f} MB peak)")
+        self._prune()
+
+    def _prune(self):
+        captures = sorted(f[:-5] for f in os.listdir(self.directory) if f.endswith(".json"))
+        for name in captures[:max(0, len(captures) - self.max_files)]:
+            for ext in (".json", ".prof"):
+                path = os.path.join(self.directory, name + ext)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def list(self):
+        """Summaries of stored captures, newest first (without the allocation lists)."""
+        if not os.path.isdir(self.directory):
+            return []
+        items = []
+        for filename in sorted(os.listdir(self.directory), reverse=True):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(self.directory, filename)) as f:
+                summary = json.load(f)
+            summary.pop("top_allocations", None)
+            summary["files"] = [filename, filename[:-5] + ".prof"]
+            items.append(summary)
+        return items
+
+
+def profiler_from_env():
+    """Build the Profiler from PROFILE_* environment variables."""
+    return Profiler(
+        directory=os.environ.get("PROFILE_DIR", "profiles"),
+        sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0)),
+        latency_ms=float(os.environ.get("PROFILE_LATENCY_MS", 5000)),
+        memory_mb=float(os.environ.get("PROFILE_MEMORY_MB", 200)),
+        max_files=int(os.environ.get("PROFILE_MAX_FILES", 50)),
+    )
@@ -0,0 +1,180 @@
+# backend/result_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from backend.parser_engine.rules import current_rules
+
+PARSER_ENGINE_DIR = Path(__file__).resolve().parent / "parser_engine"
+
+
+def parser_fingerprint():
+    """
+    Short hash of the parser engine sources and the OCR and redaction settings;
+    any parser change, turning OCR on for scans that parsed empty, or changing
+    what is redacted invalidates cached results.
+    """
+    h = hashlib.sha256()
+    for path in sorted(PARSER_ENGINE_DIR.glob("*.py")):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    h.update(os.environ.get("OCR_ENGINE", "").encode())
+    h.update(os.environ.get("REDACT_PII", "").encode())
+    return h.hexdigest()[:16]
+
+
+def bytes_digest(data):
+    """SHA-256 of an in-memory upload."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def stream_digest(stream, chunk_size=1 << 16):
+    """SHA-256 of a seekable binary stream, read in chunks; the stream is rewound afterwards."""
+    h = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        h.update(chunk)
+    stream.seek(0)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of parse results keyed by PDF content hash + parser fingerprint
+    + the fingerprint of the parser rules in use, so a rules reload misses every
+    result parsed with the old rules. The memory tier is a bounded LRU; the optional disk tier is a SQLite file
+    with TTL expiry and size-based eviction (oldest access first).
+    """
+
+    def __init__(self, max_entries=128, ttl=86400, db_path=None, max_disk_bytes=256 * 1024 * 1024,
+                 fingerprint=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.fingerprint = fingerprint or parser_fingerprint()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self._db.commit()
+
+    def key(self, digest, rules=None):
+        """
+        The key for a PDF parsed with `rules` (a RuleSet; default: the latest).
+        Build it once per request, from the rules the parse is pinned to, and
+        use it for both get() and put().
+        """
+        return f"{digest}:{self.fingerprint}:{(rules or current_rules()).fingerprint}"
+
+    # --- Lookup ---
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._memory[key]
+
+            value = self._disk_get(key, now)
+            if value is not None:
+                self._memory_put(key, value, now)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+            self._disk_put(key, value, now)
+
+    # --- Memory tier ---
+    def _memory_put(self, key, value, now):
+        self._memory[key] = (now, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # --- Disk tier ---
+    def _disk_get(self, key, now):
+        if not self._db:
+            return None
+        row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        if now - row[1] > self.ttl:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return json.loads(row[0])
+
+    def _disk_put(self, key, value, now):
+        if not self._db:
+            return
+        payload = json.dumps(value)
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, len(payload), now, now),
+        )
+        self._db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total > self.max_disk_bytes:
+            # Drop least recently accessed rows until we're back under budget
+            rows = self._db.execute("SELECT key, size FROM results ORDER BY accessed").fetchall()
+            for old_key, size in rows:
+                if total <= self.max_disk_bytes:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                total -= size
+        self._db.commit()
+
+    # --- Stats ---
+    def stats(self):
+        with self._lock:
+            disk_entries = 0
+            if self._db:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "fingerprint": self.fingerprint,
+                "rules_version": current_rules().version,
+            }
+
+
+def cache_from_env():
+    """Build the ResultCache from RESULT_CACHE_* environment variables."""
+    return ResultCache(
+        max_entries=int(os.environ.get("RESULT_CACHE_SIZE", 128)),
+        ttl=float(os.environ.get("RESULT_CACHE_TTL", 86400)),
+        db_path=os.environ.get("RESULT_CACHE_DB") or None,
+        max_disk_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    )
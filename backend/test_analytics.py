@@ -0,0 +1,120 @@
+# backend/test_analytics.py
+import datetime
+
+import pytest
+
+from backend.analytics import analyze, categorize, merchant_key
+from backend.parser_engine.records import TransactionColumns
+
+EMPTY_SUMMARY = {"transactions": 0, "spend_paise": 0, "credits_paise": 0, "net_paise": 0,
+                 "unparsed_amounts": 0, "first_date": None, "last_date": None}
+
+
+def rows(*items):
+    return TransactionColumns.from_rows(
+        {"date": d, "description": desc, "amount": amount} for d, desc, amount in items)
+
+
+@pytest.mark.parametrize("description, key", [
+    ("Reliance Smart, Andheri", "reliance smart"),
+    ("NETFLIX.COM 8812", "netflix"),
+    ("Uber Trip - Mumbai", "uber trip"),
+    ("12345", "12345"),
+])
+def test_merchant_key(description, key):
+    assert merchant_key(description) == key
+
+
+def test_categorize():
+    assert categorize("swiggy order") == "Dining"
+    assert categorize("reliance smart") == "Groceries"
+    assert categorize("someone") == "Other"
+
+
+def test_analyze_empty():
+    result = analyze(TransactionColumns())
+    assert result == {"summary": EMPTY_SUMMARY, "merchants": [], "categories": [], "daily": [],
+                      "recurring": [], "reconciliation": None}
+
+
+def test_analyze_none_values():
+    result = analyze(rows((None, None, None), ("05/03/2024", "Swiggy Order", "250.00")))
+    assert result["summary"]["transactions"] == 2
+    assert result["summary"]["unparsed_amounts"] == 1
+    assert result["summary"]["spend_paise"] == 25000
+    assert result["merchants"] == [{"merchant": "swiggy order", "category": "Dining", "count": 1,
+                                    "spend_paise": 25000}]
+    assert result["daily"] == [{"date": "2024-03-05", "count": 1, "spend_paise": 25000}]
+
+
+def test_credits_and_reconciliation():
+    columns = rows(("05/03/2024", "Swiggy Order", "250.00"), ("06/03/2024", "Refund", "50.00 CR"))
+    result = analyze(columns, "₹ 200.00")
+    assert result["summary"]["credits_paise"] == 5000
+    assert result["reconciliation"] == {"statement_total_paise": 20000, "transactions_net_paise": 20000,
+                                        "difference_paise": 0, "reconciled": True}
+    # Numbers are rupees too
+    assert analyze(columns, 200)["reconciliation"]["reconciled"]
+    assert analyze(columns, 200.5)["reconciliation"]["difference_paise"] == 50
+    assert analyze(columns, "not a number")["reconciliation"] is None
+
+
+def test_recurring_monthly():
+    start = datetime.date(2024, 1, 5)
+    columns = rows(*[((start + datetime.timedelta(days=30 * i)).strftime("%d/%m/%Y"), "Netflix.com", "649.00")
+                     for i in range(4)])
+    [found] = analyze(columns)["recurring"]
+    assert found["merchant"] == "netflix" and found["cadence"] == "monthly"
+
+
+# --- POST /analytics ---
+@pytest.fixture
+def client():
+    import app
+
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("transactions", [[], {}])
+def test_endpoint_empty(client, transactions):
+    response = client.post("/analytics", json={"transactions": transactions})
+    assert response.status_code == 200
+    assert response.json["analytics"]["summary"] == EMPTY_SUMMARY
+    assert response.json["analytics"]["reconciliation"] is None
+
+
+def test_endpoint_none_values(client):
+    response = client.post("/analytics", json={
+        "transactions": [{"date": None, "description": None, "amount": None, "type": None},
+                         {"date": "05/03/2024", "description": "Swiggy Order", "amount": "250.00"}],
+        "total_balance": None,
+    })
+    assert response.status_code == 200
+    assert response.json["analytics"]["summary"]["unparsed_amounts"] == 1
+    assert response.json["analytics"]["reconciliation"] is None
+
+
+def test_endpoint_columnar_with_gaps(client):
+    response = client.post("/analytics", json={
+        "transactions": {"date": [None, "2024-03-05"], "description": [None, "Uber"],
+                         "amount_paise": [None, 31000], "type": [None, "purchase"]},
+        "total_balance": 310,
+    })
+    assert response.status_code == 200
+    assert response.json["analytics"]["reconciliation"]["reconciled"]
+
+
+@pytest.mark.parametrize("body, query", [
+    ({"transactions": "x"}, ""),
+    ({"transactions": [1]}, ""),
+    ({"transactions": [], "total_balance": True}, ""),
+    ({"transactions": [], "total_balance": [1]}, ""),
+    ({"transactions": []}, "?top=-1"),
+    ({}, ""),
+])
+def test_endpoint_rejects_bad_input(client, body, query):
+    assert client.post("/analytics" + query, json=body).status_code == 400
+
+
+def test_endpoint_without_files(client):
+    assert client.post("/analytics", data={}).status_code == 400
@@ -0,0 +1,128 @@
+# backend/test_history.py
+import pytest
+
+from backend.history import HistoryStore
+
+
+def statement(*rows, last4="1111", cycle="01/03/2024 - 31/03/2024"):
+    return {"last_4_digits": last4, "billing_cycle": cycle, "payment_due_date": "20/04/2024",
+            "total_balance": "1,000.00",
+            "transactions": [{"date": d, "description": desc, "amount": amount} for d, desc, amount in rows]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db"))
+
+
+def test_disabled_store_is_a_no_op():
+    store = HistoryStore()
+    assert not store.enabled
+    assert store.ingest("abc", "a.pdf", "HDFC", statement()) is None
+    assert store.transactions() == ([], 0, 0)
+
+
+def test_ingest_stores_statement_and_rows(store):
+    stored = store.ingest("a" * 64, "march.pdf", "HDFC", statement(
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("07/03/2024", "Amazon India", "1,499.00"),
+    ))
+    assert stored == {"statement_id": 1, "new": True, "transactions_added": 2, "duplicates": 0}
+    rows, total, paise = store.transactions()
+    assert total == 2 and paise == 174900
+    assert [r["date"] for r in rows] == ["2024-03-07", "2024-03-05"]
+    assert rows[0]["merchant"] == "amazon india" and rows[0]["bank"] == "HDFC"
+    assert store.stats() == {"enabled": True, "statements": 1, "transactions": 2}
+
+
+def test_same_pdf_is_skipped(store):
+    data = statement(("05/03/2024", "Swiggy Order", "250.00"))
+    store.ingest("a" * 64, "march.pdf", "HDFC", data)
+    again = store.ingest("a" * 64, "march-copy.pdf", "HDFC", data)
+    assert again["new"] is False and again["duplicates"] == 1
+    assert store.stats()["transactions"] == 1
+
+
+def test_identical_rows_in_one_statement_are_kept(store):
+    stored = store.ingest("a" * 64, "march.pdf", "HDFC", statement(
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("05/03/2024", "Swiggy Order", "250.00"),
+    ))
+    assert stored["transactions_added"] == 2 and stored["duplicates"] == 0
+    assert store.transactions()[1:] == (2, 50000)
+
+
+def test_overlapping_statements_are_deduplicated(store):
+    store.ingest("a" * 64, "march.pdf", "HDFC", statement(
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("30/03/2024", "Uber Trip", "310.00"),
+    ))
+    stored = store.ingest("b" * 64, "april.pdf", "HDFC", statement(
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("30/03/2024", "Uber Trip", "310.00"),
+        ("02/04/2024", "Myntra", "999.00"),
+    ))
+    # Only the third Swiggy charge and the April row are new
+    assert stored["transactions_added"] == 2 and stored["duplicates"] == 3
+    assert store.stats()["transactions"] == 5
+
+
+def test_other_cards_are_not_deduplicated(store):
+    row = ("05/03/2024", "Swiggy Order", "250.00")
+    store.ingest("a" * 64, "a.pdf", "HDFC", statement(row, last4="1111"))
+    stored = store.ingest("b" * 64, "b.pdf", "HDFC", statement(row, last4="2222"))
+    assert stored["transactions_added"] == 1
+    assert store.transactions(card="2222")[1] == 1
+
+
+def test_unknown_card_is_never_deduplicated(store):
+    row = ("05/03/2024", "Swiggy Order", "250.00")
+    store.ingest("a" * 64, "a.pdf", "UNKNOWN", statement(row, last4=None))
+    stored = store.ingest("b" * 64, "b.pdf", "UNKNOWN", statement(row, row, last4=None))
+    assert stored["transactions_added"] == 2
+    assert store.stats()["transactions"] == 3
+
+
+def test_query_filters(store):
+    store.ingest("a" * 64, "march.pdf", "HDFC", statement(
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("15/03/2024", "Reliance Smart, Andheri", "1,200.00"),
+        ("28/03/2024", "50% off_sale", "100.00"),
+    ))
+    assert store.transactions(start="2024-03-05", end="2024-03-15")[1] == 2
+    assert store.transactions(merchant="Reliance")[0][0]["description"] == "Reliance Smart, Andheri"
+    assert store.transactions(text="50%")[1] == 1
+    assert store.transactions(text="off_s")[1] == 1
+    assert store.transactions(text="off%s")[1] == 0
+    assert store.transactions(card="9999")[1] == 0
+    rows, total, _ = store.transactions(limit=1, offset=1)
+    assert total == 3 and [r["date"] for r in rows] == ["2024-03-15"]
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "HISTORY", store)
+    return app.app.test_client()
+
+
+def test_history_endpoint_rejects_bad_dates(client):
+    for query in ("from=2024-13-01", "to=yesterday", "from=05/03/2024"):
+        response = client.get("/history/transactions?" + query)
+        assert response.status_code == 400
+        assert "YYYY-MM-DD" in response.json["error"]
+
+
+def test_history_endpoint_filters_by_date(client, store):
+    store.ingest("a" * 64, "march.pdf", "HDFC", statement(
+        ("05/03/2024", "Swiggy Order", "250.00"),
+        ("15/03/2024", "Uber Trip", "310.00"),
+    ))
+    response = client.get("/history/transactions?from=2024-03-10&to=2024-03-31")
+    assert response.status_code == 200
+    assert response.json["total_paise"] == 31000
+    assert response.json["pagination"]["total"] == 1
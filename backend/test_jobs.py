@@ -0,0 +1,45 @@
+# backend/test_jobs.py
+import time
+
+import pytest
+
+from backend.jobs import JobQueue, QueueFull, is_local_url
+
+
+def wait(queue, job_id, timeout=5):
+    end = time.monotonic() + timeout
+    while queue.get(job_id)["status"] in ("queued", "running"):
+        assert time.monotonic() < end, "job did not finish"
+        time.sleep(0.01)
+    return queue.get(job_id)
+
+
+def test_run_gets_data_filename_and_hint():
+    queue = JobQueue(lambda data, filename, bank_hint: {"size": len(data), "filename": filename, "hint": bank_hint})
+    job = wait(queue, queue.submit(b"%PDF", "march.pdf", bank_hint="HDFC"))
+    assert job["status"] == "done"
+    assert job["result"] == {"size": 4, "filename": "march.pdf", "hint": "HDFC"}
+    assert queue.stats()["completed"] == 1
+
+
+def test_failed_job():
+    def run(data, filename, bank_hint):
+        raise ValueError("bad PDF")
+
+    queue = JobQueue(run)
+    job = wait(queue, queue.submit(b"", "a.pdf"))
+    assert job == {**job, "status": "failed", "error": "bad PDF"}
+
+
+def test_draining_queue_rejects():
+    queue = JobQueue(lambda *args: None)
+    assert queue.drain(timeout=1)
+    with pytest.raises(QueueFull):
+        queue.submit(b"", "a.pdf")
+    assert queue.stats()["rejected"] == 1
+
+
+def test_webhooks_must_be_local():
+    assert is_local_url("http://localhost:9000/done")
+    assert not is_local_url("https://example.com/hook")
+    assert not is_local_url("file:///etc/passwd")
@@ -0,0 +1,60 @@
+# backend/test_result_cache.py
+import io
+import json
+
+from backend.parser_engine.rules import RULES_FILE, RuleSet, current_rules
+from backend.result_cache import ResultCache, stream_digest
+
+
+def other_rules():
+    data = json.loads(RULES_FILE.read_bytes())
+    data["version"] = str(data["version"]) + "-test"
+    return RuleSet(json.dumps(data).encode())
+
+
+def test_key_names_digest_parser_and_rules():
+    cache = ResultCache(fingerprint="parser")
+    rules = current_rules()
+    assert cache.key("abc") == cache.key("abc", rules) == f"abc:parser:{rules.fingerprint}"
+    assert cache.key("abc", other_rules()) != cache.key("abc", rules)
+
+
+def test_other_rules_miss():
+    cache = ResultCache(fingerprint="parser")
+    cache.put(cache.key("abc"), {"detected_bank": "HDFC"})
+    assert cache.get(cache.key("abc")) == {"detected_bank": "HDFC"}
+    assert cache.get(cache.key("abc", other_rules())) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_tier_is_bounded():
+    cache = ResultCache(max_entries=2, fingerprint="parser")
+    for digest in "abc":
+        cache.put(digest, digest)
+    assert cache.get("a") is None and cache.get("c") == "c"
+
+
+def test_disk_tier_outlives_memory(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResultCache(db_path=path, fingerprint="parser").put("k", {"rows": [1]})
+    cache = ResultCache(db_path=path, fingerprint="parser")
+    assert cache.get("k") == {"rows": [1]} and cache.disk_hits == 1
+
+
+def test_stream_digest_rewinds():
+    stream = io.BytesIO(b"%PDF-1.4")
+    stream.read(3)
+    assert len(stream_digest(stream)) == 64 and stream.tell() == 0
+
+
+def test_cache_parse_skips_results_from_other_rules(monkeypatch):
+    import app
+
+    cache = ResultCache(fingerprint="parser")
+    monkeypatch.setattr(app, "RESULT_CACHE", cache)
+    rules = current_rules()
+    key = cache.key("abc", rules)
+    app.cache_parse(key, rules, {"labels": {"rules": other_rules().fingerprint}}, "stale")
+    assert cache.get(key) is None
+    app.cache_parse(key, rules, {"labels": {"rules": rules.fingerprint}}, "fresh")
+    assert cache.get(key) == "fresh"
@@ -0,0 +1,178 @@
+# backend/triage.py
+import os
+import re
+from functools import lru_cache
+
+from backend.parser_engine.rules import identify_bank
+
+HEADER_BYTES = 1024
+TRAILER_BYTES = 4096
+METADATA_KEYS = ("Title", "Subject", "Author", "Creator", "Producer")
+
+# Words at least one of which shows up on the first page of any card statement
+STATEMENT_WORDS_RE = re.compile(r"statement|card|payment|due|balance|transaction|account|credit|amount", re.I)
+# Only judge "not a statement" on a first page with this much readable text
+MIN_TEXT_TO_JUDGE = 200
+
+
+class TriageRejected(Exception):
+    """A file that shouldn't reach the parser; `status` is the HTTP status to answer with."""
+
+    def __init__(self, reason, message, status, triage=None):
+        super().__init__(message)
+        self.reason = reason
+        self.status = status
+        self.triage = triage or {}
+
+
+@lru_cache(maxsize=None)
+def _first_page_text_device():
+    """The _FirstPageText device class, defined on first use so importing triage doesn't load pdfminer."""
+    from pdfminer.pdfdevice import PDFTextDevice
+    from pdfminer.pdffont import PDFUnicodeNotDefined
+
+    class _FirstPageText(PDFTextDevice):
+        """
+        Decodes a page's text operators to Unicode without pdfminer's layout
+        analysis: no LTChar objects, just each glyph's origin to tell word and
+        line breaks apart.
+        """
+
+        def __init__(self, rsrcmgr):
+            super().__init__(rsrcmgr)
+            self.parts = []
+            self._next = None
+
+        def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+            advance = font.char_width(cid) * fontsize * scaling
+            x, y = matrix[4], matrix[5]
+            if self._next is not None:
+                expected_x, last_y, size = self._next
+                if abs(y - last_y) > size / 2:
+                    self.parts.append("\n")
+                elif abs(x - expected_x) > size / 4:
+                    self.parts.append(" ")
+            try:
+                self.parts.append(font.to_unichr(cid))
+            except PDFUnicodeNotDefined:
+                pass
+            self._next = (x + advance * matrix[0], y, max(abs(fontsize * matrix[3]), 1))
+            return advance
+
+    return _FirstPageText
+
+
+class PdfTriage:
+    """
+    Cheap checks before a PDF is handed to the parser: the header and trailer
+    bytes, the cross-reference table (for encryption and the page count),
+    the Info metadata and the first page's text operators, decoded without
+    layout analysis. Files that are too big, not PDFs, truncated,
+    password-protected, scanned or clearly not statements are rejected with
+    TriageRejected; everything else gets a summary with a bank guess.
+    """
+
+    def __init__(self, max_bytes=25 * 1024 * 1024, max_pages=200, require_text=True):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.require_text = require_text
+
+    def check(self, stream):
+        """Triage a seekable binary stream (rewound afterwards); returns the summary dict."""
+        try:
+            return self._check(stream)
+        finally:
+            stream.seek(0)
+
+    def _check(self, stream):
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        info = {"bytes": size}
+        if self.max_bytes and size > self.max_bytes:
+            raise TriageRejected("too_large", f"File is larger than {self.max_bytes} bytes", 413, info)
+
+        stream.seek(0)
+        header = stream.read(HEADER_BYTES)
+        m = re.search(rb"%PDF-(\d\.\d)", header)
+        if not m:
+            raise TriageRejected("not_pdf", "Not a PDF file", 415, info)
+        info["version"] = m.group(1).decode()
+
+        stream.seek(max(0, size - TRAILER_BYTES))
+        if b"%%EOF" not in stream.read():
+            raise TriageRejected("truncated", "PDF is truncated (no end-of-file marker)", 400, info)
+
+        from pdfminer.pdfdocument import PDFDocument, PDFPasswordIncorrect
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdftypes import resolve1
+        from pdfminer.psparser import PSException
+        from pdfminer.utils import decode_text
+
+        stream.seek(0)
+        try:
+            document = PDFDocument(PDFParser(stream))
+            info["encrypted"] = document.encryption is not None
+            pages = resolve1(resolve1(document.catalog.get("Pages")).get("Count"))
+        except PDFPasswordIncorrect:
+            raise TriageRejected("encrypted", "PDF is password protected", 422, {**info, "encrypted": True})
+        except (PSException, AttributeError, TypeError, ValueError, KeyError) as e:
+            raise TriageRejected("damaged", f"PDF structure is damaged: {e}", 400, info)
+        info["pages"] = pages
+        if not isinstance(pages, int) or pages < 1:
+            raise TriageRejected("empty", "PDF has no pages", 422, info)
+        if self.max_pages and pages > self.max_pages:
+            raise TriageRejected("too_many_pages", f"PDF has more than {self.max_pages} pages", 413, info)
+
+        metadata = {}
+        for entry in document.info:
+            for key in METADATA_KEYS:
+                value = resolve1(entry.get(key))
+                if isinstance(value, bytes):
+                    value = decode_text(value)
+                if isinstance(value, str) and value.strip():
+                    metadata[key.lower()] = value.strip()
+        info["metadata"] = metadata
+
+        try:
+            text, images = _first_page(document)
+        except (PSException, AttributeError, TypeError, ValueError, KeyError) as e:
+            raise TriageRejected("damaged", f"PDF first page is damaged: {e}", 400, info)
+        info["first_page_chars"] = len(text.strip())
+        info["has_text"] = bool(text.strip())
+        info["bank_hint"] = identify_bank(" ".join(metadata.values()) + "\n" + text)
+        if not info["has_text"]:
+            info["scanned"] = images > 0
+            if self.require_text:
+                raise TriageRejected("no_text", "PDF has no text layer (scanned?)", 422, info)
+        elif (info["bank_hint"] == "UNKNOWN" and len(text) >= MIN_TEXT_TO_JUDGE
+              and not STATEMENT_WORDS_RE.search(text)):
+            raise TriageRejected("not_statement", "PDF doesn't look like a card statement", 422, info)
+        return info
+
+
+def _first_page(document):
+    """(decoded text, image XObject count) for the first page."""
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdftypes import resolve1
+
+    page = next(PDFPage.create_pages(document), None)
+    if page is None:
+        return "", 0
+    xobjects = resolve1((page.resources or {}).get("XObject")) or {}
+    images = sum(1 for x in xobjects.values() if getattr(resolve1(x).get("Subtype"), "name", None) == "Image")
+    resources = PDFResourceManager(caching=True)
+    device = _first_page_text_device()(resources)
+    PDFPageInterpreter(resources, device).process_page(page)
+    return "".join(device.parts), images
+
+
+def triage_from_env():
+    """Build the PdfTriage from TRIAGE_* environment variables."""
+    return PdfTriage(
+        max_bytes=int(os.environ.get("TRIAGE_MAX_BYTES", 25 * 1024 * 1024)),
+        max_pages=int(os.environ.get("TRIAGE_MAX_PAGES", 200)),
+        # Scans are only worth keeping when OCR can read them
+        require_text=os.environ.get("TRIAGE_REQUIRE_TEXT", "0" if os.environ.get("OCR_ENGINE") else "1").lower()
+        not in ("0", "false", "no"),
+    )
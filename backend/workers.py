@@ -0,0 +1,285 @@
+# backend/workers.py
+import io
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from backend.parser_engine.instrumentation import ParseTimeout  # noqa: F401 (re-exported)
+
+
+# Seconds past the deadline before a worker process still parsing is killed
+PARSE_TIMEOUT_GRACE = 5
+
+
+class ServerBusy(Exception):
+    """Every parse slot stayed taken for the whole queue timeout."""
+
+
+def _warm_worker():
+    # Pay for pdfplumber/pdfminer, parser imports and the first parse once per worker, not per job
+    from backend.warmup import warm_up
+    try:
+        warm_up()
+    except Exception as e:
+        # A worker that can't warm up can still take jobs; they just start cold
+        print("⚠️ Parse worker warm-up failed:", e)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _parse_job(source, timeout=None, bank_hint=None):
+    """
+    Returns (bank, parsed_data, stats) where stats holds per-stage timings and labels.
+    Raises ParseTimeout once `timeout` seconds have passed, at the next stage boundary.
+    """
+    from backend.parser_engine.instrumentation import collect_stages, deadline
+    from backend.parser_engine.pipeline import parse_statement
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with collect_stages() as timer, deadline(timeout):
+        bank, parsed_data = parse_statement(source, bank_hint)
+    return bank, parsed_data, timer.as_dict()
+
+
+# --- Worker processes ---
+def _worker_main(conn):
+    """A parse process: warm up, then run the (function, args) jobs sent over `conn` until it closes."""
+    # Ctrl+C reaches the whole process group; the server drains its workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _warm_worker()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        fn, args = job
+        try:
+            reply = (True, fn(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # An exception that doesn't pickle still has to come back as one
+            conn.send((False, RuntimeError(f"{reply[1]!r} ({e})")))
+
+
+class _Worker:
+    """One parse process and the pipe its jobs go over. Unlike a process pool's workers, it can be killed alone."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), name="parse-worker", daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def call(self, timeout, fn, *args):
+        """
+        (True, result) or (False, exception) of fn(*args) in the worker process.
+        Raises TimeoutError if no answer comes within `timeout` seconds (None:
+        no limit) and EOFError if the process died; either way it's unusable.
+        """
+        self.jobs += 1
+        self.conn.send((fn, args))
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"No answer within {timeout}s")
+        return self.conn.recv()
+
+    def stop(self):
+        """Let the process exit once it has read everything sent so far."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ParseExecutor:
+    """
+    Runs parse jobs either inline in the calling thread or in worker processes.
+    Process mode sidesteps the GIL for pdfplumber/regex work; workers are
+    recycled after `max_tasks_per_worker` jobs to cap pdfminer memory growth.
+    Jobs are a PDF path, the raw PDF bytes or a seekable binary stream.
+    Every job holds one of `max_concurrent` parse slots while it runs, in
+    either mode; a job that can't get one within `queue_timeout` seconds
+    raises ServerBusy. Jobs stop with ParseTimeout after `timeout` seconds,
+    at the next stage boundary (a Python thread can't be interrupted). In
+    process mode a worker still busy PARSE_TIMEOUT_GRACE seconds after that,
+    say inside a runaway extract_tables, is killed and replaced, so it gives
+    back its CPU and slot; inline, that stage runs to completion.
+    """
+
+    def __init__(self, mode="inline", workers=None, timeout=60, max_tasks_per_worker=50,
+                 max_concurrent=None, queue_timeout=30):
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown parse mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_concurrent = max_concurrent or self.workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._slot_lock = threading.Lock()
+        self.active = 0
+        self.busy_rejections = 0
+        self.workers_killed = 0
+        self._pool = None
+        self._idle = []
+        self._context = multiprocessing.get_context("spawn")
+
+    def _get_pool(self):
+        if self._pool is None:
+            # Inline, the threads parse; in process mode each one drives a worker process
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse")
+        return self._pool
+
+    # --- Worker processes ---
+    def _checkout(self):
+        with self._slot_lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self._context)
+
+    def _checkin(self, worker):
+        if self._pool is None or (self.max_tasks_per_worker and worker.jobs >= self.max_tasks_per_worker):
+            worker.stop()
+            return
+        with self._slot_lock:
+            self._idle.append(worker)
+
+    def _in_worker(self, timeout, fn, *args):
+        """fn(*args) in an idle worker process; one that overruns `timeout` or dies is killed and not reused."""
+        worker = self._checkout()
+        try:
+            ok, value = worker.call(timeout, fn, *args)
+        except (TimeoutError, EOFError, OSError) as e:
+            if worker.process.is_alive():
+                print(f"⚠️ Killing parse worker {worker.process.pid}: still busy after {timeout}s")
+                with self._slot_lock:
+                    self.workers_killed += 1
+            worker.kill()
+            if isinstance(e, TimeoutError):
+                raise ParseTimeout(f"Parsing took longer than {self.timeout}s")
+            raise RuntimeError(f"Parse worker died (exit code {worker.process.exitcode})")
+        self._checkin(worker)
+        if not ok:
+            raise value
+        return value
+
+    # --- Parse slots ---
+    def acquire_slot(self, block=False):
+        """
+        Take a parse slot, waiting up to queue_timeout (forever with block=True);
+        raises ServerBusy if none frees up. Pair with release_slot().
+        """
+        if not self._slots.acquire(timeout=None if block else self.queue_timeout):
+            with self._slot_lock:
+                self.busy_rejections += 1
+            raise ServerBusy(f"All {self.max_concurrent} parse slots are busy")
+        with self._slot_lock:
+            self.active += 1
+
+    def release_slot(self, *_):
+        with self._slot_lock:
+            self.active -= 1
+        self._slots.release()
+
+    @contextmanager
+    def slot(self, block=False):
+        """Hold a parse slot for the block (see acquire_slot)."""
+        self.acquire_slot(block)
+        try:
+            yield
+        finally:
+            self.release_slot()
+
+    # --- Jobs ---
+    def _dispatch(self, source, block, bank_hint=None):
+        if self.mode == "process" and hasattr(source, "read"):
+            # Open file objects can't cross the process boundary; ship the bytes
+            source.seek(0)
+            source = source.read()
+        self.acquire_slot(block)
+        try:
+            if self.mode == "process":
+                hard_limit = self.timeout + PARSE_TIMEOUT_GRACE if self.timeout else None
+                future = self._get_pool().submit(self._in_worker, hard_limit, _parse_job, source, self.timeout, bank_hint)
+            else:
+                future = self._get_pool().submit(_parse_job, source, self.timeout, bank_hint)
+        except BaseException:
+            self.release_slot()
+            raise
+        future.add_done_callback(self.release_slot)
+        return future
+
+    def submit(self, source, bank_hint=None):
+        """
+        Dispatch a job to the pool once a parse slot is free, however long that
+        takes; returns a Future of (bank, parsed_data, stats).
+        """
+        return self._dispatch(source, True, bank_hint)
+
+    def run(self, source, local=False, block=False, bank_hint=None):
+        """
+        Parse `source` and return (bank, parsed_data, stats), honouring the job timeout.
+        `bank_hint` (the triage's guess) is the first bank detection tries.
+        `local=True` parses in the calling thread even in process mode. Without
+        `block`, raises ServerBusy when no parse slot frees up within queue_timeout.
+        """
+        if self.mode == "inline" or local:
+            with self.slot(block):
+                return _parse_job(source, self.timeout, bank_hint)
+        # The worker stops itself at the deadline, or is killed once the grace has passed too
+        return self._dispatch(source, block, bank_hint).result()
+
+    def stats(self):
+        with self._slot_lock:
+            return {"max_concurrent": self.max_concurrent, "active": self.active,
+                    "busy_rejections": self.busy_rejections, "workers_killed": self.workers_killed}
+
+    def warm(self):
+        """
+        Start the worker processes now instead of on the first jobs (one per
+        concurrent ping; each warms itself up before answering). Returns how
+        many workers answered, 0 in inline mode.
+        """
+        if self.mode == "inline":
+            return 0
+        pool = self._get_pool()
+        pids = {f.result() for f in [pool.submit(self._in_worker, None, _ping) for _ in range(self.workers)]}
+        return len(pids)
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=wait, cancel_futures=True)
+        with self._slot_lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+def executor_from_env():
+    """Build the ParseExecutor from PARSE_* environment variables."""
+    return ParseExecutor(
+        mode=os.environ.get("PARSE_MODE", "inline"),
+        workers=int(os.environ.get("PARSE_WORKERS", 0)) or None,
+        timeout=float(os.environ.get("PARSE_TIMEOUT", 60)),
+        max_tasks_per_worker=int(os.environ.get("PARSE_MAX_TASKS_PER_WORKER", 50)),
+        max_concurrent=int(os.environ.get("PARSE_MAX_CONCURRENT", 0)) or None,
+        queue_timeout=float(os.environ.get("PARSE_QUEUE_TIMEOUT", 30)),
+    )
@@ -0,0 +1,376 @@
+# benchmarks/run.py
+"""
+Parser benchmark suite.
+
+    python -m benchmarks.run                          # all layouts, default sizes
+    python -m benchmarks.run --transactions 500 --terms-pages 20 --iterations 10
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 0.25
+
+Measures, on synthetic statements:
+
+  - reloading the parser rules file
+  - the pre-flight triage
+  - extract_text_from_pdf and identify_bank
+  - the PII redaction pass
+  - each bank's parse_* function
+  - the table and words transaction engines, which must return the same rows
+  - the full parse_statement pipeline, also on a scanned copy when OCR_ENGINE is set
+  - the /upload round trip and the time to the first streamed row
+  - analytics over a multi-year history (--history-rows)
+  - cold starts in fresh interpreters: importing app, the warm-up, and the
+    first /upload with and without it (--startup-runs)
+
+Before timing, the transaction line scan is checked against str.splitlines()
+(--line-samples). Reports throughput, p50/p95 latency and peak RSS; with
+--compare, exits non-zero when any p50 regresses past the tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synth import LAYOUTS, generate_statement, history_rows  # noqa: E402
+
+
+# --- Measurement helpers ---
+def _reset_peak_rss():
+    """Reset the kernel's high-water mark so each benchmark gets its own peak (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS, and never resets
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(fn, iterations, pages):
+    """Run fn() `iterations` times (after one warm-up call) and summarise."""
+    fn()
+    _reset_peak_rss()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, pages, _peak_rss_mb())
+
+
+def summarize(samples, pages, peak_rss_mb):
+    """Latency percentiles and throughput of `samples` (seconds per run)."""
+    iterations = len(samples)
+    total = sum(samples)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "ops_per_s": round(iterations / total, 2) if total else None,
+        "pages_per_s": round(iterations * pages / total, 2) if total else None,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+
+# --- Benchmarks ---
+def _load_app():
+    # Every iteration must really parse: keep the result cache out of the way
+    os.environ["RESULT_CACHE_SIZE"] = "0"
+    os.environ.pop("RESULT_CACHE_DB", None)
+    # No background warm-up parse competing with the measurements
+    os.environ["WARMUP"] = "0"
+    import app
+    return app
+
+
+def run_benchmarks(banks, transactions, terms_pages, iterations):
+    from backend.parser_engine.base_parser import extract_text_from_pdf, identify_bank
+    from backend.parser_engine.document import open_document
+    from backend.parser_engine.engine import TRANSACTION_ENGINES
+    from backend.parser_engine.ocr import get_ocr
+    from backend.parser_engine.redaction import Redactor
+    from backend.parser_engine.pipeline import PARSERS, parse_statement
+    from backend.parser_engine.rules import RuleSet, current_rules, rules_store
+    from backend.triage import PdfTriage
+
+    app = _load_app()
+    client = app.app.test_client()
+
+    results = {}
+    # A hot reload of the rules file: every profile rebuilt, patterns from the compiled-pattern cache
+    rules_data = rules_store().path.read_bytes()
+    results["rules_reload"] = measure(lambda: RuleSet(rules_data), iterations, 0)
+    for bank in banks:
+        pdf = generate_statement(bank, transactions=transactions, terms_pages=terms_pages)
+        with open_document(io.BytesIO(pdf)) as doc:
+            pages = doc.page_count
+            text = doc.text
+        label = f"{bank.lower()}[{LAYOUTS[bank]},{pages}p,{transactions}tx]"
+        print(f"⏱️  {label}", file=sys.stderr)
+
+        triage = PdfTriage(max_bytes=0, max_pages=0)
+        results[f"triage/{label}"] = measure(lambda: triage.check(io.BytesIO(pdf)), iterations, pages)
+        results[f"extract_text_from_pdf/{label}"] = measure(
+            lambda: extract_text_from_pdf(io.BytesIO(pdf)), iterations, pages)
+        results[f"identify_bank/{label}"] = measure(lambda: identify_bank(text), iterations, pages)
+
+        # The per-page redaction pass on its own, over raw page text seeded with card numbers, emails and phones
+        redactor = Redactor()
+        with open_document(io.BytesIO(generate_statement(bank, transactions=transactions,
+                                                         terms_pages=terms_pages, pii=True))) as doc:
+            page_texts = [page.extract_text() or "" for page in doc.pages]
+        results[f"redact/{label}"] = measure(
+            lambda: [redactor.redact(t) for t in page_texts], iterations, pages)
+
+        parser = PARSERS.get(bank)
+        if parser:
+            def run_parser():
+                with open_document(io.BytesIO(pdf)) as doc:
+                    parser(doc)
+            results[f"{parser.__name__}/{label}"] = measure(run_parser, iterations, pages)
+
+        profile = current_rules().profiles.get(bank)
+        if profile and profile.transaction_engine in ("table", "words"):
+            # Both ruled-table engines must agree; the words engine should be the faster one
+            rows = {}
+            for engine in ("table", "words"):
+                def run_engine(engine=engine):
+                    with open_document(io.BytesIO(pdf)) as doc:
+                        rows[engine] = list(TRANSACTION_ENGINES[engine](doc, profile))
+                results[f"engine_{engine}/{label}"] = measure(run_engine, iterations, pages)
+            assert rows["table"] == rows["words"], f"{bank}: words engine rows differ from table engine"
+
+        results[f"parse_statement/{label}"] = measure(lambda: parse_statement(io.BytesIO(pdf)), iterations, pages)
+        if get_ocr() is not None:
+            # One measured run: after it every page is in the OCR cache
+            scanned = generate_statement(bank, transactions=transactions, terms_pages=terms_pages,
+                                         scanned=range(pages))
+            results[f"parse_statement_ocr/{label}"] = measure(
+                lambda: parse_statement(io.BytesIO(scanned)), 1, pages)
+
+        def upload():
+            with contextlib.redirect_stdout(io.StringIO()):  # silence the request log
+                response = client.post("/upload", data={"pdf": (io.BytesIO(pdf), "statement.pdf")})
+            assert response.status_code == 200, response.get_data(as_text=True)
+        results[f"upload/{label}"] = measure(upload, iterations, pages)
+
+        def first_row():
+            # What the web UI requests: gzip-compressed NDJSON row arrays, stopping at the first row
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = client.post("/upload?stream=ndjson&format=rows", buffered=False,
+                                       data={"pdf": (io.BytesIO(pdf), "statement.pdf")},
+                                       headers={"Accept-Encoding": "gzip"})
+                assert response.status_code == 200, response.get_data(as_text=True)
+                decoder, body = zlib.decompressobj(31), b""
+                for chunk in response.response:
+                    body += decoder.decompress(chunk)
+                    if body.count(b"\n") >= 2:  # the header line, then the first row
+                        break
+                response.close()
+            assert body.split(b"\n")[1].startswith(b"["), body[:200]
+        if transactions:
+            results[f"first_row/{label}"] = measure(first_row, iterations, pages)
+    return results
+
+
+# Pieces of fuzzed generic statement text: dates, amounts, words and every kind of space and line break
+LINE_FUZZ_TOKENS = ["12/03/2025", "1-1-25", "31-12-2024", "1,234.56", "₹ 99.00", "₹2,500.00", "45", "1,000",
+                    "Amazon", "Swiggy Order", "CR", "-", "x"]
+LINE_FUZZ_SEPARATORS = [" ", "  ", "\t", "\n", "\r", "\r\n", "\x0b", "\x0c", "\x1c", "\x1f", "\x85",
+                        "\xa0", "\u2028", "\u2029", "\u3000"]
+
+
+def check_transaction_lines(samples, seed=0):
+    """
+    The generic extractor's single MULTILINE scan must find exactly the rows
+    of the per-line loop it replaced (str.splitlines(), then one search per
+    line) on fuzzed text; raises AssertionError on the first difference.
+    """
+    import random
+    import re
+
+    from backend.parser_engine.base_parser import iter_transactions_from_text
+    from backend.parser_engine.fields import AMOUNT_RE, DATE_RE
+
+    line_re = re.compile(r"^\s*(" + DATE_RE + r")\s+(.+?)\s+(" + AMOUNT_RE + r")\s*$")
+    rng = random.Random(seed)
+    for _ in range(samples):
+        text = "".join(rng.choice(LINE_FUZZ_TOKENS) + rng.choice(LINE_FUZZ_SEPARATORS)
+                       for _ in range(rng.randint(2, 14)))
+        expected = [
+            {"date": m.group(1), "description": m.group(2).strip(), "amount": m.group(3).strip()}
+            for m in map(line_re.search, text.splitlines()) if m
+        ]
+        assert list(iter_transactions_from_text(text)) == expected, f"line scan differs on {text!r}"
+
+
+def run_history_benchmarks(rows, iterations):
+    """Normalizing a long history into columns, then every analytics aggregate over it."""
+    from backend.analytics import analyze
+    from backend.parser_engine.records import TransactionColumns
+
+    history = history_rows(rows)
+    label = f"history[{len(history)}tx]"
+    print(f"⏱️  {label}", file=sys.stderr)
+    columns = TransactionColumns.from_rows(history)
+    found = analyze(columns)["recurring"]
+    assert len(found) >= 3, f"expected the synthetic subscriptions to be recurring, got {found}"
+    return {
+        f"records/{label}": measure(lambda: TransactionColumns.from_rows(history), iterations, 1),
+        f"analytics/{label}": measure(lambda: analyze(columns), iterations, 1),
+    }
+
+
+# Run in a fresh interpreter: argv is [pdf path, "warm" | "cold"]; prints seconds per step as JSON
+_STARTUP_SCRIPT = """
+import io, json, os, sys, time
+start = time.perf_counter()
+os.environ.update(WARMUP="0", RESULT_CACHE_SIZE="0", RESULT_CACHE_DB="", HISTORY_DB="")
+sys.path.insert(0, {root!r})
+import app
+times = {{"import": time.perf_counter() - start}}
+if sys.argv[2] == "warm":
+    step = time.perf_counter()
+    app.warm_up_app()
+    assert app.READINESS["ready"], app.READINESS
+    times["warm_up"] = time.perf_counter() - step
+with open(sys.argv[1], "rb") as f:
+    pdf = f.read()
+step = time.perf_counter()
+response = app.app.test_client().post("/upload", data={{"pdf": (io.BytesIO(pdf), "statement.pdf")}})
+assert response.status_code == 200, response.get_data(as_text=True)
+times["first_upload"] = time.perf_counter() - step
+times["ready"] = time.perf_counter() - start - times["first_upload"]
+with open("/proc/self/status") as f:
+    times["peak_rss_mb"] = next((int(l.split()[1]) / 1024 for l in f if l.startswith("VmHWM:")), 0)
+print(json.dumps(times))
+"""
+
+
+def run_startup_benchmarks(bank, transactions, terms_pages, runs):
+    """Cold-start costs, each run in a new interpreter: import, warm-up, time to ready, first /upload."""
+    pdf = generate_statement(bank, transactions=transactions, terms_pages=terms_pages)
+    label = f"{bank.lower()}[{LAYOUTS[bank]},{transactions}tx]"
+    print(f"⏱️  startup {label}", file=sys.stderr)
+    script = _STARTUP_SCRIPT.format(root=ROOT)
+    samples = {}
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(pdf)
+        f.flush()
+        for _ in range(runs):
+            for mode in ("cold", "warm"):
+                out = subprocess.run([sys.executable, "-c", script, f.name, mode], check=True,
+                                     capture_output=True, text=True).stdout
+                times = json.loads(out.strip().splitlines()[-1])
+                peak = times.pop("peak_rss_mb")
+                for step, seconds in times.items():
+                    if step == "ready" and mode == "cold":
+                        continue  # without a warm-up, "ready" is just the import
+                    name = f"startup/{step}_{mode}/{label}" if step == "first_upload" else f"startup/{step}"
+                    samples.setdefault(name, ([], peak))[0].append(seconds)
+    return {name: summarize(s, 1, peak) for name, (s, peak) in sorted(samples.items())}
+
+
+# --- Reporting & baselines ---
+def print_report(results):
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'p50 ms':>9}  {'p95 ms':>9}  {'ops/s':>8}  {'pages/s':>9}  {'peak MB':>8}")
+    for name, r in results.items():
+        print(f"{name:<{width}}  {r['p50_ms']:>9.2f}  {r['p95_ms']:>9.2f}  {r['ops_per_s']:>8.2f}  "
+              f"{r['pages_per_s']:>9.2f}  {r['peak_rss_mb']:>8.1f}")
+
+
+def compare(results, baseline, tolerance):
+    """Names of benchmarks whose p50 grew by more than `tolerance` over the baseline."""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base and r["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {base['p50_ms']:.2f} ms -> {r['p50_ms']:.2f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--banks", default=",".join(LAYOUTS), help="comma-separated banks (default: all)")
+    parser.add_argument("--transactions", type=int, default=100)
+    parser.add_argument("--terms-pages", type=int, default=4, help="trailing terms/marketing pages")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--history-rows", type=int, default=100000, help="rows in the analytics history (0 skips it)")
+    parser.add_argument("--startup-runs", type=int, default=3,
+                        help="fresh-interpreter cold starts to time (0 skips them)")
+    parser.add_argument("--line-samples", type=int, default=20000,
+                        help="fuzzed texts the generic line scan is checked on (0 skips it)")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    banks = [b.strip().upper() for b in args.banks.split(",") if b.strip()]
+    if args.line_samples:
+        check_transaction_lines(args.line_samples)
+    results = run_benchmarks(banks, args.transactions, args.terms_pages, args.iterations)
+    if args.history_rows:
+        results.update(run_history_benchmarks(args.history_rows, args.iterations))
+    if args.startup_runs and banks:
+        results.update(run_startup_benchmarks(banks[0], args.transactions, args.terms_pages, args.startup_runs))
+    print_report(results)
+
+    if args.save:
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "transactions": args.transactions,
+                "terms_pages": args.terms_pages,
+                "iterations": args.iterations,
+                "history_rows": args.history_rows,
+                "startup_runs": args.startup_runs,
+            },
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"💾 Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("❌ Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
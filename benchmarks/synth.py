@@ -0,0 +1,292 @@
+# benchmarks/synth.py
+"""
+Synthetic credit card statements for benchmarking.
+
+Writes small, valid PDFs by hand (Helvetica text plus stroked lines), so the
+benchmarks need nothing beyond the app's own requirements. Each layout mimics
+one family of real statements closely enough to exercise the same parser path.
+"""
+import random
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+MERCHANTS = [
+    "Amazon India", "Reliance Smart, Andheri", "Indigo Airlines Booking", "Swiggy Order",
+    "Shell Petrol Pump", "Myntra", "Groceries Store", "BookMyShow", "Uber Trip", "Zomato",
+    "Apollo Pharmacy", "Croma Electronics", "Big Bazaar", "Starbucks Coffee", "IRCTC Rail",
+]
+# Descriptions carrying a card number, an email and a phone number, for the redaction stage
+PII_DESCRIPTIONS = ["Refund to card 4111 1111 1111 1111", "PayPal *jane.doe@example.com", "Recharge 9876543210"]
+TYPES = ["Purchase", "Purchase", "Purchase", "Cash Advance", "Finance Charge"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+TERMS = (
+    "The minimum amount due must be paid by the payment due date to avoid late payment fees. "
+    "Interest is charged on the outstanding balance from the date of each transaction. "
+    "Reward points are credited at the end of each billing cycle and expire after three years. "
+    "Please report any unrecognised transaction within thirty days of the statement date. "
+)
+
+BANK_NAMES = {
+    "HDFC": "HDFC Bank Credit Cards",
+    "IDFC": "IDFC FIRST Bank Credit Card",
+    "CITI": "Citibank Credit Card",
+    "VISA": "VISA Platinum Credit Card",
+    "ICICI": "ICICI Bank Credit Card Division",
+    "UNKNOWN": "Northwind Finance Card Services",
+}
+
+# Which page layout each bank's statements use
+LAYOUTS = {
+    "HDFC": "ruled",
+    "IDFC": "ruled",
+    "CITI": "ruled",
+    "VISA": "ruled",
+    "ICICI": "multiline",
+    "UNKNOWN": "generic",
+}
+
+
+# --- Minimal PDF writer ---
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class _Page:
+    def __init__(self):
+        self.ops = []
+        self.images = []  # JPEG bytes, drawn as /Im0, /Im1, ...
+
+    def text(self, x, y, value, size=9):
+        self.ops.append(f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_escape(value)}) Tj ET")
+
+    def line(self, x1, y1, x2, y2):
+        self.ops.append(f"0.5 w {x1:.1f} {y1:.1f} m {x2:.1f} {y2:.1f} l S")
+
+    def image(self, jpeg, width, height):
+        """Draw a JPEG (width x height pixels) over the whole page, as a scanner would."""
+        self.ops.append(f"q {PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm /Im{len(self.images)} Do Q")
+        self.images.append((jpeg, width, height))
+
+    def content(self):
+        return "\n".join(self.ops).encode("latin-1")
+
+
+def _write_pdf(pages):
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for page in pages:
+        content = page.content()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_ref = len(objects)
+        xobjects = []
+        for i, (jpeg, width, height) in enumerate(page.images):
+            objects.append(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n" % (width, height, len(jpeg))
+                + jpeg + b"\nendstream")
+            xobjects.append(b"/Im%d %d 0 R" % (i, len(objects)))
+        resources = b"/Font << /F1 3 0 R >>" + (b" /XObject << %s >>" % b" ".join(xobjects) if xobjects else b"")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << %s >> "
+            b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, resources, content_ref)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        " ".join(f"{k} 0 R" for k in kids).encode(), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# --- Statement content ---
+def _transactions(count, rng, pii=False):
+    rows = []
+    for _ in range(count):
+        day = rng.randint(1, 28)
+        month = MONTHS[rng.randint(8, 9)]
+        amount = rng.randint(50, 250000) / 100
+        rows.append({
+            "day": day,
+            "month": month,
+            "year": 2025,
+            "description": rng.choice(MERCHANTS),
+            "amount": f"{amount:,.2f}",
+            "type": rng.choice(TYPES),
+        })
+    if pii:
+        # Every tenth row; the random stream, and so every other row, stays the same
+        for i in range(3, count, 10):
+            rows[i]["description"] = PII_DESCRIPTIONS[i // 10 % len(PII_DESCRIPTIONS)]
+    return rows
+
+
+def _header_page(bank, layout, total):
+    page = _Page()
+    y = PAGE_HEIGHT - 60
+    lines = [BANK_NAMES[bank], "STATEMENT OF ACCOUNT", "Name: Mr. Test Customer"]
+    if layout == "generic":
+        lines += [
+            "Card Number: XXXX XXXX XXXX 4821",
+            "Statement Date: 10-10-2025",
+            "Payment Due Date: 27-10-2025",
+        ]
+    else:
+        lines += [
+            "Credit Card Number: XXXX-XXXX-XXXX-4821",
+            "Statement Date: 10 Oct 2025",
+            "Payment Due Date: 27 Oct 2025",
+        ]
+    lines += ["ACCOUNT SUMMARY", f"Total Amount Due {total}", "Minimum Amount Due 1,021.00"]
+    for value in lines:
+        page.text(40, y, value, size=10)
+        y -= 18
+    return page
+
+
+def _ruled_pages(rows, rows_per_page):
+    pages = []
+    columns = [40, 120, 360, 460, 555]
+    headers = ["Date", "Description", "Amount", "Type"]
+    row_height = 18
+    for start in range(0, len(rows), rows_per_page):
+        chunk = rows[start:start + rows_per_page]
+        page = _Page()
+        top = PAGE_HEIGHT - 80
+        if start == 0:
+            page.text(40, top + 20, "TRANSACTION DETAILS", size=11)
+        bottom = top - row_height * (len(chunk) + 1)
+        for i in range(len(chunk) + 2):
+            y = top - row_height * i
+            page.line(columns[0], y, columns[-1], y)
+        for x in columns:
+            page.line(x, top, x, bottom)
+        cells = [headers] + [
+            [f"{r['day']:02d} {r['month']} {r['year']}", r["description"], r["amount"], r["type"]] for r in chunk
+        ]
+        for i, values in enumerate(cells):
+            y = top - row_height * i - 13
+            for x, value in zip(columns, values):
+                page.text(x + 4, y, value)
+        pages.append(page)
+    return pages
+
+
+def _text_pages(lines, lines_per_page, title):
+    pages = []
+    for start in range(0, max(len(lines), 1), lines_per_page):
+        page = _Page()
+        y = PAGE_HEIGHT - 60
+        if start == 0:
+            page.text(40, y, title, size=11)
+            y -= 20
+        for value in lines[start:start + lines_per_page]:
+            page.text(40, y, value)
+            y -= 13
+        pages.append(page)
+    return pages
+
+
+def _multiline_lines(rows):
+    lines = ["Date Description Amount (INR) Transaction Type"]
+    for r in rows:
+        lines += [f"{r['day']:02d} {r['month']}", str(r["year"]), f"{r['description']} {r['amount']} {r['type']}"]
+    return lines
+
+
+def _generic_lines(rows):
+    return [
+        f"{r['day']:02d}/{MONTHS.index(r['month']) + 1:02d}/{r['year']} {r['description']} {r['amount']}"
+        for r in rows
+    ]
+
+
+def generate_statement(bank="VISA", transactions=40, terms_pages=2, seed=0, scanned=(), scan_resolution=150,
+                       pii=False):
+    """
+    PDF bytes of a synthetic statement for `bank` (see LAYOUTS) with the given
+    number of transactions and trailing terms-and-conditions pages. Page
+    indexes in `scanned` are replaced by images of themselves, for OCR. With
+    `pii`, every tenth description carries a card number, email or phone number.
+    """
+    rng = random.Random(seed)
+    layout = LAYOUTS[bank]
+    rows = _transactions(transactions, rng, pii)
+    total = f"{sum(float(r['amount'].replace(',', '')) for r in rows):,.2f}"
+
+    pages = [_header_page(bank, layout, total)]
+    if layout == "ruled":
+        pages += _ruled_pages(rows, rows_per_page=35)
+        pages += _text_pages(["Points earned 1,240", "Points redeemed 0"], 40, "REWARDS SUMMARY")
+    elif layout == "multiline":
+        pages += _text_pages(_multiline_lines(rows), 54, "TRANSACTION DETAILS")
+        pages += _text_pages(["Points earned 1,240", "Points redeemed 0"], 40, "REWARDS SUMMARY")
+    else:
+        pages += _text_pages(_generic_lines(rows), 54, "Transactions")
+
+    terms = [TERMS[i:i + 95] for i in range(0, len(TERMS), 95)] * 12
+    for _ in range(terms_pages):
+        pages += _text_pages(terms, 54, "TERMS AND CONDITIONS")
+    if scanned:
+        pages = _scan(pages, [i for i in scanned if i < len(pages)], scan_resolution)
+    return _write_pdf(pages)
+
+
+def expected_rows(bank="VISA", transactions=40, seed=0, pii=False):
+    """The transactions generate_statement() prints, for correctness checks."""
+    return _transactions(transactions, random.Random(seed), pii)
+
+
+SUBSCRIPTIONS = [("NETFLIX.COM", "649.00"), ("Spotify Premium", "119.00"), ("Airtel Postpaid Bill Pay", "999.00")]
+
+
+def history_rows(transactions=100000, years=5, seed=0):
+    """
+    Parser-style rows for a multi-year card history, for the analytics
+    benchmark: random purchases plus a few monthly subscriptions.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(transactions):
+        rows.append({
+            "date": f"{rng.randint(1, 28):02d} {rng.choice(MONTHS)} {2025 - rng.randrange(years)}",
+            "description": rng.choice(MERCHANTS),
+            "amount": f"{rng.randint(50, 250000) / 100:,.2f}",
+            "type": rng.choice(TYPES),
+        })
+    for description, amount in SUBSCRIPTIONS:
+        for month in range(12 * years):
+            year = 2025 - years + 1 + month // 12
+            rows.append({"date": f"{rng.randint(4, 6):02d} {MONTHS[month % 12]} {year}",
+                         "description": description, "amount": amount, "type": "Purchase"})
+    return rows
+
+
+def _scan(pages, indexes, resolution):
+    """Swap the given pages for grayscale JPEG renderings of themselves (text-less, like a scanner's)."""
+    import io
+
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(_write_pdf(pages))) as doc:
+        for i in indexes:
+            image = doc.pages[i].to_image(resolution=resolution).original.convert("L")
+            jpeg = io.BytesIO()
+            image.save(jpeg, format="JPEG", quality=85)
+            pages[i] = _Page()
+            pages[i].image(jpeg.getvalue(), *image.size)
+    return pages
@@ -0,0 +1,6 @@
+# conftest.py
+# Test modules sit next to the code they cover; this puts the repo root on sys.path for them
+import os
+
+# Importing app must not start the background warm-up parse
+os.environ.setdefault("WARMUP", "0")
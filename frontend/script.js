@@ -50,60 +50,168 @@ uploadBtn.addEventListener("click", async () => {
   btnText.innerHTML = '<span class="spinner"></span>Analyzing...';
 
   try {
-    const response = await fetch("/upload", {
+    // Rows arrive as [date, description, amount, type] lines while the PDF is still being parsed
+    const response = await fetch("/upload?stream=ndjson&format=rows", {
       method: "POST",
       body: formData,
     });
 
-    if (!response.ok) throw new Error("Failed to process PDF");
-    const data = await response.json();
-    displayResult(data);
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.error || "Failed to process PDF");
+    }
+    await readLines(response, handleLine);
   } catch (error) {
     alert("Error: " + error.message);
   } finally {
+    statement.streaming = false;
+    scheduleRender();
     uploadBtn.disabled = false;
     btnText.textContent = "Upload & Analyze";
   }
 });
 
-// 🧩 Render results
-function displayResult(data) {
-  resultDiv.classList.remove("hidden");
+// 📡 Read an NDJSON response line by line as it arrives
+async function readLines(response, onLine) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    lines.forEach((line) => line && onLine(JSON.parse(line)));
+  }
+  buffered += decoder.decode();
+  if (buffered.trim()) onLine(JSON.parse(buffered));
+}
+
+// 🧩 Streamed statement: a header line, one array per transaction, then the summary fields
+const OVERSCAN = 10; // rows rendered above and below the visible window
+
+const summaryGrid = document.getElementById("summaryGrid");
+const tableContainer = document.querySelector(".table-container");
+const transactionsTable = document.getElementById("transactionsTable");
+const transactionCount = document.getElementById("transactionCount");
+
+let statement = { bank: "Unknown", fields: {}, rows: [], total: null, streaming: false };
+let renderQueued = false;
+let rowHeight = 0; // px, measured from a rendered row the first time the table has one
+
+function handleLine(line) {
+  if (Array.isArray(line)) {
+    statement.rows.push(line);
+    scheduleRender();
+  } else if (line.error) {
+    throw new Error(line.error);
+  } else if (line.extracted_data) {
+    statement.total = line.pagination?.total ?? null;
+    displaySummary(line.extracted_data);
+  } else {
+    startResult(line);
+  }
+}
 
-  const extractedData = data.extracted_data || {};
-  const detectedBank = data.detected_bank || "Unknown";
+function startResult(header) {
+  const fields = {};
+  (header.transaction_fields || []).forEach((name, i) => (fields[name] = i));
+  statement = { bank: header.detected_bank || "Unknown", fields, rows: [], total: null, streaming: true };
 
-  const summaryGrid = document.getElementById("summaryGrid");
+  resultDiv.classList.remove("hidden");
+  displaySummary({});
+  tableContainer.scrollTop = 0;
+  scheduleRender();
+  resultDiv.scrollIntoView({ behavior: "smooth", block: "start" });
+}
+
+function displaySummary(extractedData) {
   summaryGrid.innerHTML = `
-    <div class="summary-item"><strong>Bank</strong><span>${detectedBank}</span></div>
+    <div class="summary-item"><strong>Bank</strong><span>${statement.bank}</span></div>
     <div class="summary-item"><strong>Billing Cycle</strong><span>${extractedData.billing_cycle || "N/A"}</span></div>
     <div class="summary-item"><strong>Payment Due</strong><span>${extractedData.payment_due_date || "N/A"}</span></div>
     <div class="summary-item"><strong>Card Number</strong><span>•••• ${extractedData.last_4_digits || "N/A"}</span></div>
     <div class="summary-item"><strong>Total Balance</strong><span>₹${extractedData.total_balance || "N/A"}</span></div>
   `;
+}
 
-  const transactions = extractedData.transactions || [];
-  const transactionsTable = document.getElementById("transactionsTable");
-  transactionsTable.innerHTML = "";
-
-  document.getElementById("transactionCount").textContent =
-    `${transactions.length} transaction${transactions.length !== 1 ? "s" : ""}`;
-
-  if (transactions.length > 0) {
-    transactions.forEach((tx) => {
-      const row = document.createElement("tr");
-      const typeClass = tx.type?.toLowerCase()?.replace(/\s+/g, "-") || "unknown";
-      row.innerHTML = `
-        <td>${tx.date || "N/A"}</td>
-        <td>${tx.description || "N/A"}</td>
-        <td class="amount">₹${tx.amount || "N/A"}</td>
-        <td><span class="type-badge type-${typeClass}">${tx.type || "N/A"}</span></td>
-      `;
-      transactionsTable.appendChild(row);
-    });
-  } else {
-    transactionsTable.innerHTML = `<tr><td colspan="4" style="text-align:center; padding:20px;">No transactions found</td></tr>`;
+// 🪟 Virtualized table: only the rows in view (plus overscan) are in the DOM
+function scheduleRender() {
+  if (renderQueued) return;
+  renderQueued = true;
+  requestAnimationFrame(renderRows);
+}
+
+tableContainer.addEventListener("scroll", scheduleRender, { passive: true });
+
+function renderRows() {
+  renderQueued = false;
+  const rows = statement.rows;
+  const count = rows.length;
+  const shown = statement.total !== null && statement.total > count ? ` of ${statement.total}` : "";
+  transactionCount.textContent =
+    `${count}${shown} transaction${count !== 1 ? "s" : ""}${statement.streaming ? "…" : ""}`;
+
+  if (!count) {
+    transactionsTable.innerHTML = statement.streaming
+      ? ""
+      : `<tr><td colspan="4" style="text-align:center; padding:20px;">No transactions found</td></tr>`;
+    return;
   }
 
-  resultDiv.scrollIntoView({ behavior: "smooth", block: "start" });
+  const height = measureRowHeight(rows[0]);
+  const first = Math.max(0, Math.floor(tableContainer.scrollTop / height) - OVERSCAN);
+  const last = Math.min(count, first + Math.ceil(tableContainer.clientHeight / height) + 2 * OVERSCAN);
+
+  const fragment = document.createDocumentFragment();
+  if (first > 0) fragment.appendChild(spacerRow(first * height));
+  for (let i = first; i < last; i++) fragment.appendChild(transactionRow(rows[i]));
+  if (last < count) fragment.appendChild(spacerRow((count - last) * height));
+  transactionsTable.replaceChildren(fragment);
+}
+
+// Rendered once rather than hard-coded, so the cell height, padding and borders in style.css can't drift from it
+function measureRowHeight(sample) {
+  if (!rowHeight) {
+    const probe = transactionRow(sample);
+    transactionsTable.replaceChildren(probe);
+    rowHeight = probe.getBoundingClientRect().height;
+  }
+  return rowHeight || 1; // 0 while the table is hidden; measured again next time
+}
+
+function spacerRow(height) {
+  const row = document.createElement("tr");
+  row.className = "spacer";
+  const cell = document.createElement("td");
+  cell.colSpan = 4;
+  cell.style.height = `${height}px`;
+  row.appendChild(cell);
+  return row;
+}
+
+function transactionRow(values) {
+  const { fields } = statement;
+  const [date, description, amount, type] = ["date", "description", "amount", "type"].map((name) => values[fields[name]]);
+  const typeClass = type?.toLowerCase()?.replace(/\s+/g, "-") || "unknown";
+
+  const row = document.createElement("tr");
+  row.appendChild(textCell(date || "N/A"));
+  row.appendChild(textCell(description || "N/A")).title = description || "";
+  row.appendChild(textCell(`₹${amount || "N/A"}`)).className = "amount";
+
+  const badge = document.createElement("span");
+  badge.className = `type-badge type-${typeClass}`;
+  badge.textContent = type || "N/A";
+  const typeCell = document.createElement("td");
+  typeCell.appendChild(badge);
+  row.appendChild(typeCell);
+  return row;
+}
+
+function textCell(text) {
+  const cell = document.createElement("td");
+  cell.textContent = text;
+  return cell;
 }
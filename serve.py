@@ -0,0 +1,132 @@
+# serve.py
+"""
+Production entry point: app.py behind waitress.
+
+    python serve.py
+
+Parsing is CPU work, so the request thread pool is sized from the parse
+slots (PARSE_MAX_CONCURRENT) plus a few spare threads for cheap requests
+such as /ready, /metrics and job polls. On SIGTERM or SIGINT the server
+drains: /ready turns 503, no new connections are accepted and requests
+arriving on open keep-alive connections get a 503 that closes them.
+In-flight requests and queued jobs then get DRAIN_TIMEOUT seconds to
+finish before the parse pool shuts down.
+"""
+import json
+import os
+import signal
+import threading
+import time
+
+from waitress import wasyncore
+from waitress.server import create_server
+from werkzeug.wsgi import ClosingIterator
+
+# Request threads on top of the parse slots, so health checks never wait behind parses
+SPARE_THREADS = 4
+
+
+class InFlight:
+    """
+    WSGI middleware counting requests whose response hasn't been fully sent
+    (closed) yet. Once draining, new requests never reach the app: they get a
+    503 and their connection is closed, so keep-alive clients can't add work.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.count = 0
+        self.draining = False
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        # Checked and counted together, so no request starts after drain() has seen the count
+        with self._lock:
+            if self.draining:
+                return self._refuse(start_response)
+            self.count += 1
+        try:
+            body = self.wsgi_app(environ, start_response)
+        except BaseException:
+            self._done()
+            raise
+        return ClosingIterator(body, self._done)
+
+    def _done(self):
+        with self._lock:
+            self.count -= 1
+
+    def start_draining(self):
+        with self._lock:
+            self.draining = True
+
+    @staticmethod
+    def _refuse(start_response):
+        # A WSGI app can't send Connection: close itself (it's hop-by-hop). Without a
+        # Content-Length, and with a body of unknown length, waitress closes the connection after it
+        start_response("503 Service Unavailable", [("Content-Type", "application/json"), ("Retry-After", "5")])
+        yield json.dumps({"error": "Server is shutting down"}).encode()
+
+
+def drain(application, server, in_flight, timeout):
+    """Stop accepting, let in-flight requests and queued jobs finish (within `timeout`), then stop workers."""
+    application.READINESS.update(ready=False, draining=True)
+    application.JOB_QUEUE.closed = True
+    server.accepting = False
+    in_flight.start_draining()
+    end = time.monotonic() + timeout
+    # Keep polling so responses still being written get flushed
+    while in_flight.count and time.monotonic() < end:
+        wasyncore.loop(timeout=server.adj.asyncore_loop_timeout, map=server._map,
+                       use_poll=server.adj.asyncore_use_poll, count=1)
+    if in_flight.count:
+        print(f"⚠️ {in_flight.count} request(s) still running after {timeout}s; closing anyway")
+    if not application.JOB_QUEUE.drain(max(0.0, end - time.monotonic())):
+        print("⚠️ Jobs still queued or running after the drain timeout; they are lost")
+    application.PARSE_EXECUTOR.shutdown(wait=True)
+    server.task_dispatcher.shutdown(cancel_pending=True)
+    wasyncore.close_all(server._map)
+
+
+def main():
+    # Not at module level: spawned parse workers re-import this module and must not load the app
+    import app as application
+
+    port = int(os.environ.get("PORT", 8080))
+    executor = application.PARSE_EXECUTOR
+    threads = int(os.environ.get("SERVER_THREADS", 0)) or executor.max_concurrent + SPARE_THREADS
+    drain_timeout = float(os.environ.get("DRAIN_TIMEOUT", 30))
+
+    in_flight = InFlight(application.app)
+    server = create_server(
+        in_flight,
+        host="0.0.0.0",
+        port=port,
+        threads=threads,
+        # Refused before the body is buffered; the app checks the same limit
+        max_request_body_size=application.MAX_UPLOAD_BYTES or 1 << 30,
+        ident="credit-card-parser",
+    )
+
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"🚀 Serving on 0.0.0.0:{port} with waitress "
+          f"({threads} threads, {executor.max_concurrent} parse slots, {executor.mode} mode)")
+    # waitress's own run() has no way to stop gracefully; poll until a signal arrives
+    while not stopping.is_set():
+        wasyncore.loop(timeout=server.adj.asyncore_loop_timeout, map=server._map,
+                       use_poll=server.adj.asyncore_use_poll, count=1)
+
+    print(f"🛑 Draining ({in_flight.count} request(s) in flight, up to {drain_timeout}s)")
+    drain(application, server, in_flight, drain_timeout)
+    print("👋 Stopped")
+
+
+if __name__ == "__main__":
+    main()